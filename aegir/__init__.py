@@ -1,8 +1,11 @@
 import logging
 from collections import namedtuple
 
-from .format_error import FormatError
+from .cache import AnalysisCache, SourceCache
+from .format_error import ErrorRecord, FormatError
+from .memo import FunctionMemo
 from .parsed_data import ParsedData
+from .rules import Rule, RuleContext, RuleRegistry, default_registry
 from .source_file import SourceFile
 from aegir.aegir import Aegir
 
@@ -12,4 +15,17 @@ logging.getLogger(__name__).addHandler(logging.NullHandler())
 VersionInfo = namedtuple("VersionInfo", "major minor micro releaselevel serial")
 version_info = VersionInfo(major=0, minor=1, micro=2, releaselevel="alpha", serial=0)
 
-__all__ = ("Aegir", "FormatError", "ParsedData", "SourceFile")
+__all__ = (
+    "Aegir",
+    "AnalysisCache",
+    "ErrorRecord",
+    "FormatError",
+    "FunctionMemo",
+    "ParsedData",
+    "Rule",
+    "RuleContext",
+    "RuleRegistry",
+    "SourceCache",
+    "SourceFile",
+    "default_registry",
+)
@@ -0,0 +1,5 @@
+import sys
+
+from aegir.cli import main
+
+sys.exit(main())
@@ -1,24 +1,181 @@
+import asyncio
+import functools
+import logging
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from itertools import starmap
 from pathlib import Path
-from typing import List, Optional, Union, cast
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple, Union, cast
 
 import libcst
 from libcst import BaseExpression
+from libcst.helpers.module import ModuleNameAndPackage
 
 from aegir import FormatError, ParsedData, SourceFile
 from aegir.bot_items import MainFile
 from aegir.bot_items.command import Command
 from aegir.bot_items.event import Event
+from aegir.cache import AnalysisCache, SourceCache, _version_stamp
 from aegir.exceptions import InvalidDirPath
-from aegir.util import Import, ImportFrom, ImportEntry
+from aegir.fast_check import fast_check
+from aegir.format_error import ErrorRecord
+from aegir.fixer import apply_fixes, unified_diff, write_atomically
+from aegir.import_graph import ImportGraph
+from aegir.incremental import Report, changed_files
+from aegir.memo import FunctionMemo
+from aegir.prefilter import might_need_migration
+from aegir.positions import attach_positions
+from aegir.qualified_names import ModuleNames
+from aegir.stats import NULL_STATS, Stats, StatsHook
+from aegir.util import Import, ImportEntry, ImportFrom, NameResolver, resolve_name
+from aegir.watch import Watcher
+
+log = logging.getLogger(__name__)
+
+# Directories which never contain bot code worth migrating
+IGNORED_DIRECTORIES = frozenset({"__pycache__", "venv", "site-packages"})
+
+
+class PreparedFile(NamedTuple):
+    """A project file ready to be analysed, see :meth:`Aegir.prepare_file`."""
+
+    path: Path
+    # None when left for the analysing process to read
+    source: Optional[str]
+    module: Optional[ModuleNameAndPackage]
+    display_path: str
+    cache_key: Optional[str] = None
+    # The pre-filter found nothing to migrate, so it needn't be analysed
+    skipped: bool = False
+
+
+def _convert_file(
+    file_path: Path,
+    bot_variable: str,
+    source: Optional[str] = None,
+    collect_stats: bool = False,
+    serialize: bool = False,
+    compact: bool = False,
+    memo: Optional[FunctionMemo] = None,
+    fast_tier: bool = False,
+    module: Optional[ModuleNameAndPackage] = None,
+    display_path: Optional[str] = None,
+) -> Optional[Tuple[ParsedData, Optional[dict]]]:
+    """Convert a single project file, this is run within pool workers.
+
+    Returns the converted data alongside its serialized form if requested.
+    When compacting, errors are recorded against ``display_path``
+    if given, otherwise against ``file_path``.
+    """
+    stats: Optional[Stats] = Stats(str(file_path)) if collect_stats else None
+    try:
+        if source is None:
+            source = file_path.read_bytes().decode("utf-8")
+
+        parsed_data: Optional[ParsedData] = None
+        if fast_tier:
+            with (stats or NULL_STATS).phase("fast_tier"):
+                parsed_data = fast_check(source, bot_variable)
+
+        if parsed_data is None:
+            parsed_data = SourceFile(
+                source,
+                backref=Aegir,
+                bot_variable=bot_variable,
+                stats=stats,
+                memo=memo,
+                module=module,
+            ).convert()
+        elif stats is not None:
+            stats.increment("fast_tier_files")
+            parsed_data.stats = stats
+
+        # Both find each error's position
+        serialized: Optional[dict] = parsed_data.serialize() if serialize else None
+        if compact:
+            # Drop the cst here so it never has to be sent back
+            parsed_data = parsed_data.compact(display_path or str(file_path))
+    except (libcst.ParserSyntaxError, UnicodeDecodeError) as e:
+        log.warning("Skipping '%s' as it could not be parsed: %s", file_path, e)
+        return None
+    except Exception:  # One file shouldn't stop the rest of the project
+        log.exception("Skipping '%s' as it could not be analysed", file_path)
+        return None
+
+    return parsed_data, serialized
+
+
+def _fix_file(
+    file_path: Path,
+    bot_variable: str,
+    source: Optional[str] = None,
+    collect_stats: bool = False,
+    serialize: bool = False,
+    compact: bool = False,
+    memo: Optional[FunctionMemo] = None,
+    fast_tier: bool = False,
+    module: Optional[ModuleNameAndPackage] = None,
+    display_path: Optional[str] = None,
+    dry_run: bool = False,
+) -> Optional[str]:
+    """Apply every fix to a single file, this is run within pool workers.
+
+    This takes the same arguments as :func:`_convert_file` followed by
+    ``dry_run``, see :meth:`Aegir.conversion_args`. Only a unified diff
+    of the changes is returned, so results are never collected into stats,
+    serialized or compacted.
+    """
+    try:
+        if source is None:
+            source = file_path.read_bytes().decode("utf-8")
+
+        if fast_tier and fast_check(source, bot_variable) is not None:
+            # Nothing to fix, so there is no need for a cst
+            return None
+
+        source_file = SourceFile(
+            source, backref=Aegir, bot_variable=bot_variable, memo=memo, module=module
+        )
+        parsed_data = source_file.convert()
+    except (libcst.ParserSyntaxError, UnicodeDecodeError) as e:
+        log.warning("Skipping '%s' as it could not be parsed: %s", file_path, e)
+        return None
+    except Exception:  # One file shouldn't stop the rest of the project
+        log.exception("Skipping '%s' as it could not be analysed", file_path)
+        return None
+
+    if not parsed_data.errors:
+        return None
+
+    fixed_source = apply_fixes(source_file.file_cst, parsed_data.errors).code
+    if fixed_source == source:
+        return None
+
+    if not dry_run:
+        write_atomically(file_path, fixed_source)
+
+    return unified_diff(source, fixed_source, display_path or str(file_path))
 
 
 class Aegir:
+    # Set to a SourceCache to reuse results for repeated sources
+    source_cache: Optional[SourceCache] = None
+
     def __init__(
         self,
         dir_path: Union[str, Path],
         cog_directory_path: Optional[Path] = None,
         *,
         bot_variable: str,
+        cache: Optional[AnalysisCache] = None,
+        collect_stats: bool = False,
+        stats_hook: Optional[StatsHook] = None,
+        prefilter: bool = True,
+        compact: bool = False,
+        memo: Optional[FunctionMemo] = None,
+        follow_imports: bool = False,
+        fast_tier: bool = True,
+        qualified_names: bool = False,
     ):
         if not isinstance(dir_path, Path):
             dir_path = Path(dir_path)
@@ -28,6 +185,27 @@ class Aegir:
 
         self._main_file: Optional[MainFile] = None
         self._bot_variable: str = bot_variable
+        self._main_file_data: Optional[ParsedData] = None
+        self._project_files: Dict[Path, ParsedData] = {}
+        self._cache: Optional[AnalysisCache] = cache
+        self._collect_stats: bool = collect_stats or stats_hook is not None
+        self._stats_hook: Optional[StatsHook] = stats_hook
+        self._stats: Optional[Stats] = None
+        self._prefilter: bool = prefilter
+        self._skipped_files: List[Path] = []
+        # Keep only cst free records so memory stays flat on large projects
+        self._compact: bool = compact
+        # Only used when analysing within this process
+        self._memo: Optional[FunctionMemo] = memo
+        self._follow_imports: bool = follow_imports
+        self._import_graph: Optional[ImportGraph] = None
+        self._unreachable_files: List[Path] = []
+        # Decorators are also classified by where they were imported from
+        self._qualified_names: bool = qualified_names
+        self._module_names: Optional[ModuleNames] = None
+        # Files without errors are analysed without building a cst,
+        # which only knows names as they are written
+        self._fast_tier: bool = fast_tier and not qualified_names
 
         if not self._main_file_path.exists():
             raise InvalidDirPath
@@ -38,7 +216,7 @@ class Aegir:
     def as_cst(file_path: Union[Path, str]) -> libcst.Module:
         """Parse a given file."""
         if isinstance(file_path, Path):
-            source = file_path.read_text()
+            source = file_path.read_bytes().decode("utf-8")
         else:
             source = file_path
         tree = libcst.parse_module(source)
@@ -55,75 +233,840 @@ class Aegir:
         return all_imports
 
     @classmethod
-    def parse_out_import_from(cls, cst: libcst.ImportFrom) -> ImportFrom:
-        import_path = cls.recursive_attribute_resolution(cst.module, "")
+    def parse_out_import_from(
+        cls, cst: libcst.ImportFrom, names: Optional[NameResolver] = None
+    ) -> ImportFrom:
+        """Given an ImportFrom return the module imported from and what it imports.
+
+        Pass the resolver used for the rest of the file as ``names``
+        so every name within the file is only resolved once.
+        """
+        # Relative imports keep their leading dots, I.e. from . import x
+        import_path = "." * len(cst.relative)
+        if cst.module is not None:
+            import_path += (
+                names.resolve(cst.module) if names else resolve_name(cst.module)
+            )
 
         entries: List[ImportEntry] = []
-        for item in cst.names:
-            entries.append(ImportEntry(cst=item, item_imported=item.name.value))
+        if not isinstance(cst.names, libcst.ImportStar):
+            for item in cst.names:
+                entries.append(ImportEntry(cst=item, item_imported=item.name.value))
 
         return ImportFrom(cst=cst, from_module=import_path, items_imported=entries)
 
     @classmethod
     def recursive_attribute_resolution(
-        cls, cst: libcst.Attribute, imported_from: str
+        cls, cst: libcst.Attribute, imported_from: str = ""
     ) -> str:
-        if isinstance(cst, libcst.Call):
-            imported_from = cls.recursive_attribute_resolution(cst.func, imported_from)  # type: ignore
+        """Kept for compatibility, see :func:`aegir.util.resolve_name`.
 
-        elif isinstance(cst.value, libcst.Attribute):
-            # Recurse till Attr value is the base module, I.e. Nextcord
-            imported_from = cls.recursive_attribute_resolution(cst.value, imported_from)
+        ``imported_from`` is no longer used, every
+        caller passed an empty string.
+        """
+        return resolve_name(cst)
 
-        else:
-            # This should be the base package name now
-            if isinstance(cst.value, libcst.Name):
-                # Type check guard
-                imported_from = cst.value.value
-
-        if isinstance(cst, libcst.Name):
-            imported_from = (
-                f"{imported_from}.{cst.value}" if imported_from else cst.value
+    def discover_files(self) -> List[Path]:
+        """Return every python file in the project other then the main file.
+
+        When using ``follow_imports=True`` only files reachable from the
+        main file are returned, the rest are available via :attr:`unreachable_files`.
+        Files are returned sorted so that output order is stable.
+        """
+        files = self._discover_all_files()
+        if not self._follow_imports:
+            return files
+
+        if self._import_graph is None:
+            self._import_graph = ImportGraph(
+                self._module_roots(), [self._main_file_path, *files]
             )
         else:
-            if not isinstance(cst, libcst.Call):
-                imported_from = (
-                    f"{imported_from}.{cst.attr.value}"
-                    if imported_from
-                    else cst.attr.value
-                )
+            self._import_graph.update([self._main_file_path, *files])
+
+        reachable = self._import_graph.reachable(self._main_file_path)
+        if reachable is None:
+            self._unreachable_files = []
+            return files
+
+        self._unreachable_files = [file for file in files if file not in reachable]
+        if self._unreachable_files:
+            log.info(
+                "Skipping %s of %s files which the main file never loads",
+                len(self._unreachable_files),
+                len(files),
+            )
+            log.debug("Unreachable files: %s", self._unreachable_files)
+
+        return [file for file in files if file in reachable]
+
+    def _module_roots(self) -> List[Path]:
+        """Return the directories modules are imported relative to."""
+        roots: List[Path] = [self._main_file_path.parent]
+        if self._cog_directory_path is not None:
+            cog_root = Path(self._cog_directory_path).absolute().parent
+            if cog_root != roots[0]:
+                roots.append(cog_root)
+
+        return roots
+
+    def _modules_for(self, files: List[Path]) -> List[Optional[ModuleNameAndPackage]]:
+        """Return the module name of each file when using ``qualified_names=True``.
+
+        These are worked out once per file for the whole project
+        and passed to workers rather than being worked out within them.
+        """
+        if not self._qualified_names:
+            return [None] * len(files)
+
+        if self._module_names is None:
+            self._module_names = ModuleNames(self._module_roots())
+
+        self._module_names.update(files)
+        return [self._module_names.module_for(file) for file in files]
+
+    def _cache_context(self, module: Optional[ModuleNameAndPackage]) -> Tuple[str, ...]:
+        if module is None:
+            return (self._bot_variable,)
+
+        # Relative imports depend on where the file is
+        return self._bot_variable, f"module={module.name};package={module.package}"
+
+    def _might_need_migration(self, raw_source: bytes) -> bool:
+        if self._qualified_names:
+            # A bot may be imported under any name, so any decorator may be on one
+            return might_need_migration(raw_source)
+
+        return might_need_migration(raw_source, self._bot_variable)
+
+    def _discover_all_files(self) -> List[Path]:
+        roots: List[Path] = [self._main_file_path.parent]
+        if self._cog_directory_path is not None:
+            roots.append(Path(self._cog_directory_path).absolute())
+
+        files = set()
+        for root in roots:
+            for file in root.glob("**/*.py"):
+                relative_parts = file.relative_to(root).parts[:-1]
+                if any(
+                    part.startswith(".") or part in IGNORED_DIRECTORIES
+                    for part in relative_parts
+                ):
+                    continue
+
+                file = file.absolute()
+                if file != self._main_file_path:
+                    files.add(file)
 
-        return imported_from
+        return sorted(files)
+
+    def convert(self, *, whole_project: bool = False, workers: int = 1):
+        """Convert the main file, and optionally every other file in the project.
+
+        Parameters
+        ----------
+        whole_project: bool
+            If True, every python file under the main file's
+            directory and the cog directory is also converted.
+            Files with nothing to migrate are skipped without parsing
+            unless ``prefilter=False`` was passed, see :attr:`skipped_files`.
+            With ``follow_imports=True`` files the main file never
+            loads are skipped as well, see :attr:`unreachable_files`.
+            With ``qualified_names=True`` decorators are also classified
+            by where they were imported from, I.e. ``c.has_role`` given
+            ``from nextcord.ext import commands as c``.
+        workers: int
+            How many processes to convert project files with.
+            Defaults to 1, which converts within this process.
+            Pass 0 to use one process per cpu.
+        """
+        self._stats = Stats(str(self._main_file_path)) if self._collect_stats else None
 
-    def convert(self):
         # Handle main file first
+        self._main_file = None
+        self._main_file_data = self._convert_main_file()
+        if self._compact:
+            self._main_file_data = self._main_file_data.compact(
+                self.display_path(self._main_file_path)
+            )
+            self._main_file = None
+
+        self._project_files = {}
+        if whole_project:
+            self._convert_project_files(workers)
+
+        if self._stats is not None:
+            self._stats.merge(self._main_file_data.stats)
+            for parsed_data in self._project_files.values():
+                self._stats.merge(parsed_data.stats)
+
+            self._stats.increment("files", 1 + len(self._project_files))
+            if self._stats_hook is not None:
+                self._stats_hook(self._stats)
+
+        if self._memo is not None:
+            self._memo.save()
+
+        self.has_been_converted = True
+
+    async def convert_async(
+        self,
+        *,
+        whole_project: bool = False,
+        workers: int = 1,
+        executor: Optional[Executor] = None,
+        timeout: Optional[float] = None,
+    ) -> None:
+        """Run :meth:`convert` without blocking the event loop.
+
+        Parameters
+        ----------
+        whole_project: bool
+            See :meth:`convert`
+        workers: int
+            See :meth:`convert`
+        executor: Optional[Executor]
+            The executor to run the conversion within,
+            defaults to the event loop's default executor.
+            As this converts in place it must be a thread based executor,
+            use ``workers`` to spread project files across processes.
+        timeout: Optional[float]
+            How long to wait before raising :class:`asyncio.TimeoutError`.
+
+        Notes
+        -----
+        Cancelling this stops waiting on the conversion,
+        however a conversion already underway in a thread will run to completion.
+        """
+        if isinstance(executor, ProcessPoolExecutor):
+            raise TypeError(
+                "convert_async converts in place and requires a thread based executor"
+            )
+
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(
+            executor,
+            functools.partial(
+                self.convert, whole_project=whole_project, workers=workers
+            ),
+        )
+        await asyncio.wait_for(future, timeout)
+
+    def _convert_main_file(self) -> ParsedData:
+        module = self._modules_for([self._main_file_path])[0]
+        cache_key: Optional[str] = None
+        if self._cache is not None:
+            cache_key = self._cache.key_for(
+                self._main_file_path.read_bytes(), "main", *self._cache_context(module)
+            )
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                if self._stats is not None:
+                    self._stats.increment("cache_hits")
+
+                return ParsedData.deserialize(cached)
+
+        stats: Optional[Stats] = (
+            Stats(str(self._main_file_path)) if self._collect_stats else None
+        )
         self._main_file = MainFile(
             self._main_file_path,
             self._cog_directory_path,
             backref=self,
             bot_variable=self._bot_variable,
+            stats=stats,
+            memo=self._memo,
+            module=module,
         )
         self._main_file.convert()
+        errors: List[FormatError] = self._main_file.errors
+        attach_positions(self._main_file.file_cst, errors)
+        if stats is not None:
+            stats.increment("errors", len(errors))
+            stats.increment("events", len(self._main_file.events))
+            stats.increment("commands", len(self._main_file.commands))
 
-        # for file in self._dir_path.glob("**/*.py"):
-        #     ast_module = self.as_ast(file)
-        #     for _ast in ast_module.body:
-        #         self.parse_ast(_ast)
+        parsed_data = ParsedData(
+            errors=errors,
+            commands=self._main_file.commands,
+            events=self._main_file.events,
+            stats=stats,
+        )
+        if cache_key is not None:
+            self._cache.set(cache_key, parsed_data.serialize())
 
-        self.has_been_converted = True
+        return parsed_data
+
+    def _convert_project_files(self, workers: int) -> None:
+        files: List[Path] = self.discover_files()
+        results: Dict[Path, ParsedData] = {}
+        to_convert: List[PreparedFile] = []
+        cache_keys: Dict[Path, str] = {}
+        for prepared in self._read_project_files(files):
+            file = prepared.path
+            if self._cache is None:
+                to_convert.append(prepared)
+                continue
+
+            cached = self._cache.get(prepared.cache_key)
+            if cached is not None:
+                results[file] = ParsedData.deserialize(cached)
+                if self._compact:
+                    results[file] = results[file].compact(prepared.display_path)
+
+                if self._stats is not None:
+                    self._stats.increment("cache_hits")
+
+                continue
+
+            cache_keys[file] = prepared.cache_key
+            to_convert.append(prepared)
+
+        converted = self._map_files(
+            _convert_file,
+            workers,
+            [
+                self.conversion_args(
+                    prepared,
+                    workers=workers,
+                    serialize=self._cache is not None,
+                    compact=self._compact,
+                )
+                for prepared in to_convert
+            ],
+        )
+        self._store_project_results(
+            [prepared.path for prepared in to_convert], converted, results, cache_keys
+        )
+
+        self._project_files = {file: results[file] for file in files if file in results}
+        if self._stats is not None:
+            self._stats.increment("skipped_files", len(self._skipped_files))
+
+    def _read_project_files(self, files: List[Path]) -> Iterator[PreparedFile]:
+        """Yield each file, skipping those the pre-filter rules out.
+
+        Sources are only read here when required, see :meth:`prepare_file`.
+        """
+        self._skipped_files = []
+        # Worked out together, rather then one file at a time
+        self._modules_for(files)
+        for file in files:
+            prepared = self.prepare_file(file, read=False)
+            if prepared is None:
+                continue
+
+            if prepared.skipped:
+                self._skipped_files.append(file)
+                continue
+
+            yield prepared
+
+        log.debug(
+            "Pre-filter skipped %s of %s project files",
+            len(self._skipped_files),
+            len(files),
+        )
+
+    def prepare_file(self, file: Path, *, read: bool = True) -> Optional[PreparedFile]:
+        """Read a file, checking whether the pre-filter rules it out.
+
+        Returns None if the file could not be read.
+
+        Parameters
+        ----------
+        file: Path
+            The file to prepare.
+        read: bool
+            If False, the source is only read when the pre-filter or
+            cache needs it, otherwise it is left for workers to read.
+        """
+        prepared = PreparedFile(
+            file, None, self._modules_for([file])[0], self.display_path(file)
+        )
+        needs_filter = self._prefilter and file != self._main_file_path
+        if not read and not needs_filter and self._cache is None:
+            return prepared
+
+        try:
+            raw_source = file.read_bytes()
+            source = raw_source.decode()
+        except (OSError, UnicodeDecodeError) as e:
+            log.warning("Skipping '%s' as it could not be read: %s", file, e)
+            return None
+
+        if needs_filter and not self._might_need_migration(raw_source):
+            # Nothing in here could need migrating, so skip parsing it
+            return prepared._replace(skipped=True)
+
+        cache_key: Optional[str] = None
+        if self._cache is not None:
+            cache_key = self._cache.key_for(
+                source, "source", *self._cache_context(prepared.module)
+            )
+
+        return prepared._replace(source=source, cache_key=cache_key)
+
+    def conversion_args(
+        self,
+        prepared: PreparedFile,
+        *,
+        workers: int = 1,
+        serialize: bool = False,
+        compact: bool = False,
+    ) -> tuple:
+        """Return the arguments which convert a prepared file within a worker.
+
+        Parameters
+        ----------
+        prepared: PreparedFile
+            The file to convert, see :meth:`prepare_file`.
+        workers: int
+            How many processes are converting files.
+        serialize: bool
+            Whether to also return the serialized results.
+        compact: bool
+            Whether to return cst free results.
+        """
+        return (
+            prepared.path,
+            self._bot_variable,
+            prepared.source,
+            self._collect_stats,
+            serialize,
+            compact,
+            self._memo_for(workers),
+            self._fast_tier,
+            prepared.module,
+            prepared.display_path,
+        )
+
+    def _memo_for(self, workers: int) -> Optional[FunctionMemo]:
+        # Memos can't be shared with other processes
+        return self._memo if workers == 1 else None
+
+    @staticmethod
+    def _map_files(func, workers: int, arguments: List[tuple]) -> Iterator:
+        """Map func over each file's arguments, yielding in order.
+
+        These are usually from :meth:`conversion_args`.
+        """
+        if workers == 0:
+            workers = os.cpu_count() or 1
+
+        if workers == 1 or len(arguments) <= 1:
+            yield from starmap(func, arguments)
+            return
+
+        chunksize = max(1, len(arguments) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # Executor.map yields in submission order, keeping output stable
+            yield from executor.map(func, *zip(*arguments), chunksize=chunksize)
+
+    def _store_project_results(self, files, converted, results, cache_keys) -> None:
+        for file, result in zip(files, converted):
+            if result is None:
+                continue
+
+            parsed_data, serialized = result
+            results[file] = parsed_data
+            if serialized is not None:
+                self._cache.set(cache_keys[file], serialized)
+
+    def iter_errors(
+        self, *, workers: int = 1, queue_size: int = 16
+    ) -> Iterator[ErrorRecord]:
+        """Stream compact error records for the whole project as they are found.
+
+        Unlike :meth:`convert` nothing is kept once emitted, so peak
+        memory depends on the worker count rather than the project size.
+        Records are yielded in the same order regardless of worker count.
+        File paths are relative to the main file's directory,
+        the same as :meth:`convert_incremental`.
+
+        Parameters
+        ----------
+        workers: int
+            See :meth:`convert`
+        queue_size: int
+            How many files may wait between any two pipeline stages.
+        """
+        from aegir.pipeline import StreamingPipeline
+
+        self._skipped_files = []
+        yield from StreamingPipeline(self, workers=workers, queue_size=queue_size)
+
+    def watch(self, *, interval: float = 0.5, debounce: float = 0.2) -> Watcher:
+        """Return a :class:`Watcher` re-analysing files as they are modified.
+
+        Iterating over it yields an :class:`ErrorDelta` for each file
+        whose errors changed, starting with every error in the project.
+
+        Parameters
+        ----------
+        interval: float
+            How many seconds to wait between checking for changes.
+        debounce: float
+            How many seconds files must go unmodified before being analysed.
+        """
+        return Watcher(self, interval=interval, debounce=debounce)
+
+    def convert_incremental(
+        self,
+        base_revision: str,
+        report_path: Union[str, Path],
+        *,
+        workers: int = 1,
+    ) -> List[ErrorRecord]:
+        """Find errors for the whole project, only analysing files changed since base_revision.
+
+        Errors for every other file come from the report stored at
+        ``report_path`` by a previous run, which is then updated.
+        Files missing from the report, or whose content differs from
+        when they were reported, are always analysed. When using a
+        cache these are looked up within it first.
+
+        Parameters
+        ----------
+        base_revision: str
+            The git revision to compare against, I.e. the merge base.
+        report_path: Union[str, Path]
+            Where results are stored between runs.
+        workers: int
+            See :meth:`convert`
+
+        Returns
+        -------
+        List[ErrorRecord]
+            Every error within the project, with file paths
+            relative to the main file's directory.
+
+        Raises
+        ------
+        GitError
+            Git failed to list the changed files.
+        """
+        report_path = Path(report_path)
+        report = Report.load(
+            report_path,
+            stamp=f"{_version_stamp().decode()};bot_variable={self._bot_variable}"
+            f";qualified_names={self._qualified_names}",
+        )
+
+        root = self._main_file_path.parent
+        changed = changed_files(root, base_revision)
+        if self._cog_directory_path is not None:
+            cog_directory = Path(self._cog_directory_path).absolute()
+            if root not in cog_directory.parents and cog_directory != root:
+                changed |= changed_files(cog_directory, base_revision)
+
+        files: List[Path] = [self._main_file_path, *self.discover_files()]
+        keys: Dict[Path, str] = {file: self.display_path(file) for file in files}
+        # Files may have changed between the report and base_revision,
+        # so content is compared rather then only trusting git
+        digests: Dict[Path, Optional[str]] = {}
+        for file in files:
+            try:
+                digests[file] = Report.digest_for(file.read_bytes())
+            except OSError:
+                digests[file] = None
+
+        to_convert = [
+            file
+            for file in files
+            if file in changed or not report.is_current(keys[file], digests[file])
+        ]
+        log.info(
+            "Analysing %s of %s files, the rest are unchanged since %s",
+            len(to_convert),
+            len(files),
+            base_revision,
+        )
+
+        readable: List[PreparedFile] = list(
+            self._read_project_files(
+                [file for file in to_convert if file != self._main_file_path]
+            )
+        )
+        if self._main_file_path in to_convert:
+            readable.insert(0, self.prepare_file(self._main_file_path, read=False))
+
+        for file in self._skipped_files:
+            report.set(keys[file], [], digests[file])
+
+        to_analyse: List[PreparedFile] = []
+        for prepared in readable:
+            cached = None
+            if self._cache is not None:
+                cached = self._cache.get(prepared.cache_key)
+
+            if cached is None:
+                to_analyse.append(prepared)
+                continue
+
+            parsed_data = ParsedData.deserialize(cached).compact(prepared.display_path)
+            report.set(keys[prepared.path], parsed_data.errors, digests[prepared.path])
+
+        converted = self._map_files(
+            _convert_file,
+            workers,
+            [
+                self.conversion_args(
+                    prepared,
+                    workers=workers,
+                    serialize=self._cache is not None,
+                    compact=True,
+                )
+                for prepared in to_analyse
+            ],
+        )
+        for prepared, result in zip(to_analyse, converted):
+            file = prepared.path
+            if result is None:
+                # Analyse it again next time
+                report.discard(keys[file])
+                continue
+
+            parsed_data, serialized = result
+            if serialized is not None:
+                self._cache.set(prepared.cache_key, serialized)
+
+            report.set(keys[file], parsed_data.errors, digests[file])
+
+        # Forget files which no longer exist
+        existing = {keys[file] for file in files}
+        for key in [key for key in report.files if key not in existing]:
+            report.discard(key)
+
+        report.save(report_path)
+        if self._memo is not None:
+            self._memo.save()
+
+        return report.errors(keys[file] for file in files)
+
+    def fix(
+        self, *, whole_project: bool = False, workers: int = 1, dry_run: bool = False
+    ) -> Dict[Path, str]:
+        """Apply every fix, rewriting each file in a single pass.
+
+        Each file is parsed once, has all of its fixes applied
+        in one transform and is then written back atomically.
+
+        Parameters
+        ----------
+        whole_project: bool
+            See :meth:`convert`
+        workers: int
+            See :meth:`convert`
+        dry_run: bool
+            If True, files are left untouched.
+
+        Returns
+        -------
+        Dict[Path, str]
+            A unified diff for every file which was, or
+            would be when using ``dry_run``, changed.
+        """
+        files: List[PreparedFile] = [
+            self.prepare_file(self._main_file_path, read=False)
+        ]
+        if whole_project:
+            files.extend(self._read_project_files(self.discover_files()))
+
+        diffs = self._map_files(
+            _fix_file,
+            workers,
+            [
+                (*self.conversion_args(prepared, workers=workers), dry_run)
+                for prepared in files
+            ],
+        )
+        return {prepared.path: diff for prepared, diff in zip(files, diffs) if diff}
+
+    def full_result(self, file_path: Union[str, Path]) -> ParsedData:
+        """Convert a single file, returning results with their cst attached.
+
+        This is useful alongside ``compact=True``, where
+        only cst free records are kept for each file.
+        """
+        file_path = Path(file_path).absolute()
+        return SourceFile(
+            file_path.read_bytes().decode("utf-8"),
+            backref=self,
+            bot_variable=self._bot_variable,
+            module=self._modules_for([file_path])[0],
+        ).convert()
+
+    def display_path(self, file_path: Path) -> str:
+        """Return a file's path relative to the main file's directory, if within it.
+
+        Compacted errors are recorded against these paths.
+        """
+        try:
+            return str(file_path.relative_to(self._main_file_path.parent))
+        except ValueError:
+            return str(file_path)
+
+    @property
+    def main_file_path(self) -> Path:
+        """The absolute path of the main file."""
+        return self._main_file_path
+
+    @property
+    def memo(self) -> Optional[FunctionMemo]:
+        """The memo used when analysing within this process, if any."""
+        return self._memo
+
+    @property
+    def unreachable_files(self) -> List[Path]:
+        """Project files the main file never imports or loads as an extension.
+
+        These are only found when using ``follow_imports=True``
+        and are never parsed.
+        """
+        return self._unreachable_files
+
+    @property
+    def skipped_files(self) -> List[Path]:
+        """Project files the pre-filter found nothing to migrate within.
+
+        These files were never parsed.
+        """
+        return self._skipped_files
+
+    @property
+    def stats(self) -> Optional[Stats]:
+        """Timings and counters for the last conversion, if collected."""
+        return self._stats
+
+    @property
+    def cache(self) -> Optional[AnalysisCache]:
+        """The on disk cache used for conversions, if any."""
+        return self._cache
+
+    @property
+    def project_files(self) -> Dict[Path, ParsedData]:
+        """The converted project files, excluding the main file."""
+        return self._project_files
+
+    @classmethod
+    def convert_source(
+        cls,
+        source: str,
+        *,
+        bot_variable: Optional[str] = None,
+        collect_stats: bool = False,
+        stats_hook: Optional[StatsHook] = None,
+    ) -> ParsedData:
+        """Convert a piece of standalone code.
+
+        Parameters
+        ----------
+        source: str
+            The code to convert.
+        bot_variable: Optional[str]
+            The name of the bot variable used within the code.
+        collect_stats: bool
+            If True, timings and counters are attached
+            to the returned data as ``stats``.
+        stats_hook: Optional[StatsHook]
+            Called with the stats once converted,
+            implies ``collect_stats``.
+        """
+        if collect_stats or stats_hook is not None:
+            # Cached results carry no stats so are bypassed
+            stats = Stats("<source>")
+            parsed_data = SourceFile(
+                source, backref=cls, bot_variable=bot_variable, stats=stats
+            ).convert()
+            if stats_hook is not None:
+                stats_hook(stats)
+
+            return parsed_data
+
+        if cls.source_cache is not None:
+            cached = cls.source_cache.get(source, bot_variable)
+            if cached is not None:
+                return cached
+
+        parsed_data = cls._convert_source_uncached(source, bot_variable)
+        if cls.source_cache is not None:
+            cls.source_cache.set(source, bot_variable, parsed_data)
+
+        return parsed_data
 
     @classmethod
-    def convert_source(cls, source: str) -> ParsedData:
-        source = SourceFile(source, backref=cls)
+    def _convert_source_uncached(
+        cls, source: str, bot_variable: Optional[str]
+    ) -> ParsedData:
+        source = SourceFile(source, backref=cls, bot_variable=bot_variable)
         return source.convert()
 
+    @classmethod
+    def fix_source(cls, source: str, *, bot_variable: Optional[str] = None) -> str:
+        """Return the given source with every fix applied in a single pass."""
+        source_file = SourceFile(source, backref=cls, bot_variable=bot_variable)
+        parsed_data = source_file.convert()
+        if not parsed_data.errors:
+            return source
+
+        return apply_fixes(source_file.file_cst, parsed_data.errors).code
+
+    @classmethod
+    async def convert_source_async(
+        cls,
+        source: str,
+        *,
+        bot_variable: Optional[str] = None,
+        executor: Optional[Executor] = None,
+        timeout: Optional[float] = None,
+    ) -> ParsedData:
+        """Run :meth:`convert_source` without blocking the event loop.
+
+        Parameters
+        ----------
+        source: str
+            The code to convert.
+        bot_variable: Optional[str]
+            The name of the bot variable used within the code.
+        executor: Optional[Executor]
+            The thread or process executor to convert within,
+            defaults to the event loop's default executor.
+        timeout: Optional[float]
+            How long to wait before raising :class:`asyncio.TimeoutError`.
+
+        Notes
+        -----
+        Cancelling this cancels the conversion if it has not yet started,
+        otherwise the result is simply discarded once it completes.
+        """
+        if cls.source_cache is not None:
+            cached = cls.source_cache.get(source, bot_variable)
+            if cached is not None:
+                return cached
+
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(
+            executor,
+            functools.partial(cls._convert_source_uncached, source, bot_variable),
+        )
+        parsed_data = await asyncio.wait_for(future, timeout)
+        if cls.source_cache is not None:
+            cls.source_cache.set(source, bot_variable, parsed_data)
+
+        return parsed_data
+
     @property
-    def errors(self) -> List[FormatError]:
-        errors: List[FormatError] = []
-        for event in self._main_file.events:
-            errors.extend(event.errors)
+    def errors(self) -> List[Union[FormatError, ErrorRecord]]:
+        """Every error found, as records when using ``compact=True``.
 
-        for command in self._main_file.commands:
-            errors.extend(command.errors)
+        Records' file paths are relative to the main file's directory,
+        the same as :meth:`iter_errors`.
+        """
+        errors: List[Union[FormatError, ErrorRecord]] = list(
+            self._main_file_data.errors
+        )
+        for parsed_data in self._project_files.values():
+            errors.extend(parsed_data.errors)
 
         return errors
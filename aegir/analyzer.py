@@ -0,0 +1,486 @@
+from __future__ import annotations
+
+import logging
+from typing import (
+    AbstractSet,
+    TYPE_CHECKING,
+    Dict,
+    FrozenSet,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+    Union,
+)
+
+import libcst
+from libcst.helpers.module import ModuleNameAndPackage
+
+from aegir.bot_items import Command, Decorator, Event, Listener
+from aegir.format_error import FormatError
+from aegir.memo import FunctionMemo, FunctionSummary
+from aegir.qualified_names import imported_instances, import_origins, qualify
+from aegir.rules import Rule, RuleContext, RuleRegistry, default_registry
+from aegir.stats import NULL_STATS, Stats
+from aegir.util import (
+    DECORATOR_ACTION_TYPES,
+    ActionType,
+    BotAssignment,
+    DecoratorTable,
+    Import,
+    ImportFrom,
+    NameResolver,
+    RunMode,
+    find_bot_instances,
+    run_calls_for,
+)
+
+if TYPE_CHECKING:
+    from aegir import Aegir
+
+log = logging.getLogger(__name__)
+
+
+def _last_name(node: libcst.BaseExpression) -> Optional[str]:
+    # I.e. Bot for commands.Bot
+    if isinstance(node, libcst.Name):
+        return node.value
+
+    if isinstance(node, libcst.Attribute):
+        return node.attr.value
+
+    return None
+
+
+class _FunctionRecord:
+    def __init__(self, cst: libcst.FunctionDef, parent: Optional[str]):
+        self.cst: libcst.FunctionDef = cst
+        # The top level function this is defined within, if any
+        self.parent: Optional[str] = parent
+        self.processes_commands: bool = False
+        # Only used alongside a FunctionMemo
+        self.memo_key: Optional[bytes] = None
+        self.summary: Optional[FunctionSummary] = None
+        self.visit_body: bool = False
+        self.import_count: int = 0
+        self.assignment_count: int = 0
+        self.class_count: int = 0
+
+
+class Analyzer(libcst.CSTVisitor):
+    """Collect everything Aegir needs from a file in a single traversal.
+
+    This gathers imports, bot instances, the run mode, the asyncio entry
+    function, possible events or commands and any ``process_commands`` awaits.
+    Bot instances are any assignment of a ``Bot`` or ``Client``, including
+    subclasses, so decorators and run calls are classified once the
+    module has been visited using a table built from them.
+    Nodes any rule checks are noted along the way and checked once
+    the module has been visited, at which point ``events``,
+    ``commands`` and ``errors`` are populated.
+
+    When given the file's ``module`` decorators are also classified
+    by where they were imported from, see :mod:`aegir.qualified_names`.
+    Bot instances found outside of the code being visited, I.e. in
+    another part of the same document, can be given as ``known_instances``.
+    """
+
+    def __init__(
+        self,
+        *,
+        backref: Union[Aegir, Type[Aegir]],
+        bot_variable: str,
+        stats: Stats = NULL_STATS,
+        memo: Optional[FunctionMemo] = None,
+        rules: Optional[RuleRegistry] = None,
+        module: Optional[ModuleNameAndPackage] = None,
+        known_instances: AbstractSet[str] = frozenset(),
+    ):
+        self._backref: Union[Aegir, Type[Aegir]] = backref
+        self._bot_variable: str = bot_variable
+        self._known_instances: AbstractSet[str] = known_instances
+        self._memo: Optional[FunctionMemo] = memo
+        # Lives as long as this traversal, so names are resolved once per node
+        self._names: NameResolver = NameResolver()
+        self._module: Optional[ModuleNameAndPackage] = module
+        # What each imported name refers to, only used alongside a module
+        self._origins: Dict[str, str] = {}
+
+        self.imports: List[Union[Import, ImportFrom]] = []
+        self.run_mode: RunMode = RunMode.unknown
+        # What asyncio.run calls if applicable
+        self.entry_func: Optional[str] = None
+        self.events: List[Union[Event, Listener]] = []
+        self.commands: List[Command] = []
+        self.errors: List[FormatError] = []
+        # Every name which refers to a bot, I.e. bot or self.bot
+        self.bot_instances: Set[str] = set()
+        self._decorator_table: Optional[DecoratorTable] = None
+        self._run_calls: FrozenSet[str] = frozenset()
+        self._classes: List[Tuple[str, List[str]]] = []
+        self._assignments: List[BotAssignment] = []
+        # Lines which may start the bot, checked in order once instances are known
+        self._run_lines: List[libcst.SimpleStatementLine] = []
+
+        rules = rules if rules is not None else default_registry
+        self._dispatch = rules.dispatch_table()
+        # Each node a rule checks, alongside the function it is within
+        self._pending: List[
+            Tuple[libcst.CSTNode, Tuple[Rule, ...], Optional[_FunctionRecord]]
+        ] = []
+        # Bodies can only be skipped when no rule looks within them
+        self._can_skip_bodies: bool = rules.node_types <= {
+            libcst.FunctionDef,
+            libcst.Decorator,
+        }
+
+        self._records: List[_FunctionRecord] = []
+        self._function_stack: List[Optional[_FunctionRecord]] = []
+        self._class_depth: int = 0
+
+        self._stats: Stats = stats
+        if stats.enabled:
+            # Only pay for counting nodes when asked to
+            self.on_visit = self._counting_on_visit
+
+    def _counting_on_visit(self, node: libcst.CSTNode) -> bool:
+        self._stats.increment("nodes")
+        return super().on_visit(node)
+
+    def on_leave(self, original_node: libcst.CSTNode) -> None:
+        rules = self._dispatch[type(original_node)]
+        if rules:
+            self._pending.append((original_node, rules, self._nearest_record()))
+
+        super().on_leave(original_node)
+
+    def _nearest_record(self) -> Optional[_FunctionRecord]:
+        for record in reversed(self._function_stack):
+            if record is not None:
+                return record
+
+        return None
+
+    def visit_Import(self, node: libcst.Import) -> None:
+        self.imports.append(self._backref.parse_out_import(node))
+
+    def visit_ImportFrom(self, node: libcst.ImportFrom) -> None:
+        self.imports.append(self._backref.parse_out_import_from(node, self._names))
+
+    def visit_ClassDef(self, node: libcst.ClassDef) -> None:
+        self._class_depth += 1
+        bases = [_last_name(base.value) for base in node.bases]
+        self._classes.append((node.name.value, [base for base in bases if base]))
+
+    def visit_Assign(self, node: libcst.Assign) -> None:
+        for target in node.targets:
+            self._note_assignment(target.target, node.value)
+
+    def visit_AnnAssign(self, node: libcst.AnnAssign) -> None:
+        if node.value is not None:
+            self._note_assignment(node.target, node.value)
+
+    def _note_assignment(
+        self, target: libcst.BaseExpression, value: libcst.BaseExpression
+    ) -> None:
+        if not isinstance(target, (libcst.Name, libcst.Attribute)):
+            return
+
+        if isinstance(value, libcst.Call):
+            called = _last_name(value.func)
+            if called is not None:
+                self._assignments.append(BotAssignment(target, called, None))
+
+        elif isinstance(value, libcst.Name):
+            self._assignments.append(BotAssignment(target, None, value.value))
+
+    def leave_ClassDef(self, original_node: libcst.ClassDef) -> None:
+        self._class_depth -= 1
+
+    def visit_FunctionDef(self, node: libcst.FunctionDef) -> Optional[bool]:
+        self._stats.increment("functions")
+        record: Optional[_FunctionRecord] = None
+        if not self._class_depth and isinstance(node.asynchronous, libcst.Asynchronous):
+            if not self._function_stack:
+                record = _FunctionRecord(node, None)
+
+            elif len(self._function_stack) == 1 and self._function_stack[0]:
+                # Possibly defined within the asyncio.run entry function
+                parent = self._function_stack[0]
+                parent.visit_body = True
+                record = _FunctionRecord(node, parent.cst.name.value)
+
+        self._function_stack.append(record)
+        if record is None:
+            return
+
+        self._records.append(record)
+        if self._memo is None:
+            return
+
+        with self._stats.phase("memo"):
+            record.memo_key = self._memo.key_for(node, self._bot_variable)
+            record.summary = self._memo.get(record.memo_key)
+
+        record.import_count = len(self.imports)
+        record.assignment_count = len(self._assignments)
+        record.class_count = len(self._classes)
+        if (
+            record.summary is not None
+            and not record.summary.visit_body
+            and self._can_skip_bodies
+        ):
+            self._stats.increment("memo_hits")
+            record.processes_commands = record.summary.processes_commands
+            for decorator in node.decorators:
+                rules = self._dispatch[type(decorator)]
+                if rules:
+                    self._pending.append((decorator, rules, record))
+
+            # Everything needed from the body is already known
+            return False
+
+    def leave_FunctionDef(self, original_node: libcst.FunctionDef) -> None:
+        record = self._function_stack.pop()
+        if record is not None and (
+            len(self.imports) > record.import_count
+            # I.e. global bot; bot = commands.Bot()
+            or len(self._assignments) > record.assignment_count
+            or len(self._classes) > record.class_count
+        ):
+            record.visit_body = True
+
+    def visit_SimpleStatementLine(self, node: libcst.SimpleStatementLine) -> None:
+        if not self._function_stack:
+            self._run_lines.append(node)
+
+    def visit_Await(self, node: libcst.Await) -> None:
+        if not self._function_stack:
+            return
+
+        expression = node.expression
+        if not isinstance(expression, libcst.Call) or not isinstance(
+            expression.func, libcst.Attribute
+        ):
+            return
+
+        if expression.func.attr.value != "process_commands":
+            return
+
+        bot_name = expression.func.value
+        if isinstance(bot_name, libcst.Attribute):
+            bot_name = bot_name.attr
+
+        if isinstance(bot_name, libcst.Name):
+            bot_name = bot_name.value
+
+        if bot_name not in ("bot", "client"):
+            log.debug(
+                "Guessing they process commands as they dont use bot or client as a variable name. %s",
+                expression.func,
+            )
+
+        record = self._nearest_record()
+        if record is not None:
+            record.processes_commands = True
+
+    def leave_Module(self, original_node: libcst.Module) -> None:
+        if self._module is not None:
+            with self._stats.phase("qualified_names"):
+                self._origins = import_origins(self.imports, self._module)
+
+        with self._stats.phase("bot_instances"):
+            self.bot_instances = find_bot_instances(
+                self._bot_variable,
+                self._classes,
+                self._assignments,
+                self._names.resolve,
+                self._known_instances,
+            )
+            self._decorator_table = DecoratorTable(
+                self.bot_instances
+                | imported_instances(self._origins, self.bot_instances),
+                any_instance=not self._bot_variable,
+            )
+            self._run_calls = run_calls_for(self.bot_instances)
+
+        with self._stats.phase("run_mode"):
+            for line in self._run_lines:
+                self.parse_run_mode(line)
+                if self.run_mode != RunMode.unknown:
+                    break
+
+        if self.run_mode == RunMode.unknown:
+            log.debug(
+                "Code does not appear to be an entire file, "
+                "parsing as if just 1 item"
+            )
+            self.run_mode = RunMode.bot_run
+
+        top_level: List[_FunctionRecord] = []
+        in_entry: List[_FunctionRecord] = []
+        for record in self._records:
+            if record.parent is None:
+                top_level.append(record)
+
+            elif (
+                self.run_mode == RunMode.asyncio_run
+                and record.parent == self.entry_func
+            ):
+                # Everything is defined within the function asyncio.run calls
+                in_entry.append(record)
+
+        actions: Dict[int, Union[Command, Event, Listener]] = {}
+        for record in top_level + in_entry:
+            action: Union[
+                Command, Event, Listener, None
+            ] = self.parse_for_possible_event_or_command(record)
+            if isinstance(action, Command):
+                self.commands.append(action)
+            elif isinstance(action, (Event, Listener)):
+                self.events.append(action)
+
+            if action is not None:
+                actions[id(record)] = action
+
+        with self._stats.phase("rules"):
+            self._check_rules(actions)
+
+    def _check_rules(self, actions: Dict[int, Union[Command, Event, Listener]]) -> None:
+        # Errors are grouped by action, in the same order as events and commands
+        errors: Dict[int, List[FormatError]] = {
+            id(action): [] for action in (*self.events, *self.commands)
+        }
+        contexts: Dict[int, RuleContext] = {}
+        file_errors: List[FormatError] = []
+        for node, rules, record in self._pending:
+            action = actions.get(id(record)) if record is not None else None
+            context = contexts.get(id(action))
+            if context is None:
+                context = contexts[id(action)] = RuleContext(
+                    action, bot_variable=self._bot_variable
+                )
+
+            found = errors[id(action)] if action is not None else file_errors
+            for rule in rules:
+                found.extend(rule.check(node, context))
+
+        self._pending = []
+        for action in (*self.events, *self.commands):
+            action._errors = errors[id(action)]
+            self.errors.extend(action._errors)
+
+        self.errors.extend(file_errors)
+
+    def parse_for_possible_event_or_command(
+        self, record: _FunctionRecord
+    ) -> Union[Command, Event, None]:
+        cst: libcst.FunctionDef = record.cst
+        function_name: str = cst.name.value
+        if function_name == self.entry_func:
+            return
+
+        if record.summary is not None:
+            decorator_names = record.summary.decorator_names
+        else:
+            decorator_names = self._resolve_decorators(cst)
+            if record.memo_key is not None:
+                self._memo.set(
+                    record.memo_key,
+                    FunctionSummary(
+                        decorator_names=decorator_names,
+                        processes_commands=record.processes_commands,
+                        visit_body=record.visit_body,
+                    ),
+                )
+
+        action_type, decorators = self._classify_decorators(cst, decorator_names)
+        if action_type == ActionType.UNKNOWN:
+            log.warning(
+                "Couldn't figure out what type of action '%s' was", function_name
+            )
+
+        elif action_type == ActionType.COMMAND:
+            return Command(function_name)
+
+        elif action_type == ActionType.EVENT:
+            return Event(
+                function_name,
+                decorators=decorators,
+                event_type=action_type,
+                cst=cst,
+                processes_commands=record.processes_commands,
+            )
+
+        elif action_type == ActionType.LISTENER:
+            return Listener(
+                function_name,
+                decorators=decorators,
+                event_type=action_type,
+                cst=cst,
+                processes_commands=record.processes_commands,
+            )
+
+    def _resolve_decorators(self, cst: libcst.FunctionDef) -> Tuple[str, ...]:
+        self._stats.increment("decorators", len(cst.decorators))
+        with self._stats.phase("decorators"):
+            return tuple(
+                self._names.resolve(cst_decor.decorator) for cst_decor in cst.decorators
+            )
+
+    def _classify_decorators(
+        self, cst: libcst.FunctionDef, decorator_names: Tuple[str, ...]
+    ) -> Tuple[ActionType, List[Decorator]]:
+        action_type: ActionType = ActionType.UNKNOWN
+        decorators: List[Decorator] = []
+        for cst_decor, decor_name in zip(cst.decorators, decorator_names):
+            classified_as = decor_name
+            if self._origins:
+                # Where a name was imported from decides what it is
+                classified_as = qualify(decor_name, self._origins)
+
+            decor_type = self._decorator_table.classify(classified_as)
+
+            if decor_type is None:
+                continue
+
+            decorators.append(Decorator(decor_name, decor_type, cst_decor))
+            action_type = DECORATOR_ACTION_TYPES.get(decor_type, action_type)
+
+        return action_type, decorators
+
+    def parse_run_mode(self, line: libcst.SimpleStatementLine) -> None:
+        try:
+            line_doing = line.body[0].value  # type: ignore
+        except (AttributeError, TypeError):
+            return
+
+        if isinstance(line_doing, libcst.Await):
+            line_doing = line_doing.expression
+
+        if not isinstance(line_doing, libcst.Call):
+            # Skip lines not calling something
+            return
+
+        func_call = self._names.resolve(line_doing.func)
+        call_arguments = line_doing.args
+        if func_call == "asyncio.run":
+            if (
+                len(call_arguments) != 1
+                or not isinstance(call_arguments[0].value, libcst.Call)
+                or not isinstance(call_arguments[0].value.func, libcst.Name)
+            ):
+                log.debug("Skipping asyncio.run as it isn't given a call to main()")
+                return
+
+            self.run_mode = RunMode.asyncio_run
+            self.entry_func = call_arguments[0].value.func.value
+
+        elif func_call in self._run_calls:
+            if len(call_arguments) != 1:
+                # I.e. bot.run(token, reconnect=True) under if __name__ == "__main__"
+                log.debug("Skipping %s as it isn't given just the token", func_call)
+                return
+
+            self.run_mode = RunMode.bot_run
@@ -4,6 +4,8 @@ from aegir import FormatError
 class Command:
     def __init__(self, name: str):
         self.name: str = name
+        # Set by the Analyzer once rules have been checked
+        self._errors: list[FormatError] = []
 
     def add_extra_decor(
         self,
@@ -12,4 +14,4 @@ class Command:
 
     @property
     def errors(self) -> list[FormatError]:
-        return []
+        return self._errors
@@ -0,0 +1,246 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from importlib import metadata
+from pathlib import Path
+from typing import Any, Optional, Union
+
+log = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=None)
+def _package_stamp() -> str:
+    from aegir import __version__
+
+    try:
+        libcst_version = metadata.version("libcst")
+    except metadata.PackageNotFoundError:  # pragma: no cover
+        libcst_version = "unknown"
+
+    return f"aegir={__version__};libcst={libcst_version}"
+
+
+def _rules_stamp() -> str:
+    from aegir.rules import default_registry
+
+    return ",".join(sorted(default_registry.rule_ids))
+
+
+def _version_stamp() -> bytes:
+    # Rules may be registered at any time, so are checked on every call
+    return f"{_package_stamp()};rules={_rules_stamp()}".encode()
+
+
+class AnalysisCache:
+    """A content addressed on disk cache of file analysis results.
+
+    Entries are keyed by a hash of the file contents alongside the
+    Aegir and libcst versions and the registered rules, so changing
+    any of them invalidates them.
+
+    Parameters
+    ----------
+    directory: Union[str, Path]
+        Where to store cache entries.
+    max_size: int
+        The maximum size in bytes the cache may take up on disk,
+        the least recently used entries are evicted past this.
+    """
+
+    def __init__(
+        self, directory: Union[str, Path], *, max_size: int = 64 * 1024 * 1024
+    ):
+        self.directory: Path = Path(directory)
+        self.max_size: int = max_size
+        self._size: Optional[int] = None
+
+    def __repr__(self):
+        return f"AnalysisCache(directory='{self.directory}')"
+
+    def key_for(self, source: Union[str, bytes], *context: str) -> str:
+        """Return the cache key for the given file contents."""
+        if isinstance(source, str):
+            source = source.encode()
+
+        hasher = hashlib.sha256(_version_stamp())
+        for item in context:
+            hasher.update(b"\0" + item.encode())
+
+        hasher.update(b"\0" + source)
+        return hasher.hexdigest()
+
+    def _path_for(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+    def _entries(self) -> list[Path]:
+        return list(self.directory.glob("*/*.json"))
+
+    def get(self, key: str) -> Optional[dict]:
+        """Return the stored entry for this key, if any."""
+        path = self._path_for(key)
+        try:
+            data = json.loads(path.read_text())
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            log.debug("Discarding unreadable cache entry %s", path)
+            self.invalidate(key)
+            return None
+
+        try:
+            # Mark as recently used for eviction purposes
+            os.utime(path)
+        except OSError:
+            pass
+
+        return data
+
+    def set(self, key: str, data: dict) -> None:
+        """Store an entry, evicting older entries if required."""
+        path = self._path_for(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        content = json.dumps(data, separators=(",", ":")).encode()
+
+        file_descriptor, temp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(file_descriptor, "wb") as file:
+                file.write(content)
+            os.replace(temp_path, path)
+        except OSError:
+            log.debug("Failed to write cache entry %s", path)
+            Path(temp_path).unlink(missing_ok=True)
+            return
+
+        if self._size is None:
+            self._size = sum(entry.stat().st_size for entry in self._entries())
+        else:
+            self._size += len(content)
+
+        if self._size > self.max_size:
+            self.evict()
+
+    def evict(self) -> None:
+        """Remove the least recently used entries till within ``max_size``."""
+        entries = []
+        for entry in self._entries():
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry))
+
+        entries.sort()
+        size = sum(entry[1] for entry in entries)
+        for _, entry_size, entry in entries:
+            if size <= self.max_size:
+                break
+
+            entry.unlink(missing_ok=True)
+            size -= entry_size
+
+        self._size = size
+
+    def invalidate(self, key: str) -> None:
+        """Remove a single entry from the cache."""
+        self._path_for(key).unlink(missing_ok=True)
+        self._size = None
+
+    def clear(self) -> None:
+        """Remove every entry from the cache."""
+        for entry in self._entries():
+            entry.unlink(missing_ok=True)
+
+        self._size = 0
+
+
+class SourceCache:
+    """An in memory LRU cache of :meth:`Aegir.convert_source` results.
+
+    Parameters
+    ----------
+    capacity: int
+        The maximum amount of results to keep.
+    ttl: Optional[float]
+        How many seconds a result remains valid for,
+        defaults to forever.
+    normalize_whitespace: bool
+        If True, sources differing only in line endings, trailing
+        whitespace or trailing blank lines share a result. Leading blank
+        lines are kept, as they change the position of every error.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 256,
+        *,
+        ttl: Optional[float] = None,
+        normalize_whitespace: bool = False,
+    ):
+        self.capacity: int = capacity
+        self.ttl: Optional[float] = ttl
+        self.normalize_whitespace: bool = normalize_whitespace
+        self.hits: int = 0
+        self.misses: int = 0
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._lock: threading.Lock = threading.Lock()
+
+    def __repr__(self):
+        return (
+            f"SourceCache(size={len(self)}, capacity={self.capacity}, "
+            f"hits={self.hits}, misses={self.misses})"
+        )
+
+    def __len__(self):
+        return len(self._entries)
+
+    def key_for(self, source: str, bot_variable: Optional[str]) -> str:
+        """Return the cache key for the given source."""
+        if self.normalize_whitespace:
+            source = "\n".join(line.rstrip() for line in source.splitlines())
+            source = source.rstrip("\n")
+
+        hasher = hashlib.sha256((bot_variable or "").encode())
+        # Results depend on which rules are registered
+        hasher.update(b"\0" + _rules_stamp().encode())
+        hasher.update(b"\0" + source.encode())
+        return hasher.hexdigest()
+
+    def get(self, source: str, bot_variable: Optional[str] = None) -> Optional[Any]:
+        """Return the cached result for this source, if any."""
+        key = self.key_for(source, bot_variable)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (
+                self.ttl is None or time.monotonic() - entry[0] < self.ttl
+            ):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+
+            if entry is not None:
+                del self._entries[key]
+
+            self.misses += 1
+            return None
+
+    def set(self, source: str, bot_variable: Optional[str], result: Any) -> None:
+        """Store a result, evicting the least recently used if full."""
+        key = self.key_for(source, bot_variable)
+        with self._lock:
+            self._entries[key] = (time.monotonic(), result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove every result and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
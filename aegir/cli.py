@@ -0,0 +1,223 @@
+"""The ``aegir`` command line interface.
+
+Errors are streamed as json lines, one object per error,
+as soon as they are found. For example::
+
+    {"file_path": "bot/main.py", "line": 12, "column": 0, ..., "rule_id": "event-called", ...}
+
+The exit code is 1 if any errors were found and 0 otherwise.
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+from pathlib import Path
+from typing import Optional, TextIO
+
+from aegir import Aegir, AnalysisCache
+from aegir.exceptions import GitError
+from aegir.memo import FunctionMemo
+
+log = logging.getLogger(__name__)
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="aegir",
+        description="Find code which needs migrating from nextcord 2 to 3, "
+        "streaming one json object per error.",
+    )
+    parser.add_argument(
+        "paths",
+        nargs="+",
+        type=Path,
+        help="The main file of each project to check.",
+    )
+    parser.add_argument(
+        "--cog-directory",
+        type=Path,
+        default=None,
+        help="A cog directory outside of the main file's directory.",
+    )
+    parser.add_argument(
+        "--bot-variable",
+        default="bot",
+        help="The name of the bot variable, defaults to 'bot'.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="How many processes to analyse with, 0 uses one per cpu.",
+    )
+    parser.add_argument(
+        "--cache",
+        type=Path,
+        default=None,
+        help="A directory to cache analysis results in between runs.",
+    )
+    parser.add_argument(
+        "--memo",
+        type=Path,
+        default=None,
+        help="A file to remember per function analysis in between runs.",
+    )
+    parser.add_argument(
+        "--follow-imports",
+        action="store_true",
+        help="Only analyse files the main file imports or loads as an extension.",
+    )
+    parser.add_argument(
+        "--no-prefilter",
+        action="store_true",
+        help="Fully parse every file, even those without anything to migrate.",
+    )
+    parser.add_argument(
+        "--no-fast-tier",
+        action="store_true",
+        help="Build a cst for every file, even those the quick check finds no errors in.",
+    )
+    parser.add_argument(
+        "--qualified-names",
+        action="store_true",
+        help="Also classify decorators by where they were imported from, "
+        "I.e. aliased nextcord imports.",
+    )
+    parser.add_argument(
+        "--output",
+        "-o",
+        default="-",
+        help="Where to write results, defaults to stdout.",
+    )
+    parser.add_argument(
+        "--since",
+        metavar="REVISION",
+        default=None,
+        help="Only analyse files changed since this git revision, "
+        "reusing the report for every other file.",
+    )
+    parser.add_argument(
+        "--report",
+        type=Path,
+        default=Path(".aegir_report.json"),
+        help="Where --since stores results between runs.",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep running, outputting errors added or removed as files change.",
+    )
+    parser.add_argument("--verbose", "-v", action="store_true")
+    return parser
+
+
+def _stream_errors(args: argparse.Namespace, output: TextIO) -> int:
+    cache: Optional[AnalysisCache] = None
+    if args.cache is not None:
+        cache = AnalysisCache(args.cache)
+
+    memo: Optional[FunctionMemo] = None
+    if args.memo is not None:
+        memo = FunctionMemo(path=args.memo)
+
+    found = 0
+    for path in args.paths:
+        aegir = Aegir(
+            path,
+            args.cog_directory,
+            bot_variable=args.bot_variable,
+            cache=cache,
+            prefilter=not args.no_prefilter,
+            fast_tier=not args.no_fast_tier,
+            qualified_names=args.qualified_names,
+            memo=memo,
+            follow_imports=args.follow_imports,
+        )
+        if args.since is not None:
+            records = aegir.convert_incremental(
+                args.since, args.report, workers=args.workers
+            )
+        else:
+            records = aegir.iter_errors(workers=args.workers)
+
+        for record in records:
+            output.write(json.dumps(record._asdict()) + "\n")
+            output.flush()
+            found += 1
+
+    log.info("Found %s errors", found)
+    return found
+
+
+def _watch(args: argparse.Namespace, output: TextIO) -> None:
+    aegir = Aegir(
+        args.paths[0],
+        args.cog_directory,
+        bot_variable=args.bot_variable,
+        prefilter=not args.no_prefilter,
+        fast_tier=not args.no_fast_tier,
+        qualified_names=args.qualified_names,
+        follow_imports=args.follow_imports,
+        # Unchanged functions within modified files are then skipped
+        memo=FunctionMemo(path=args.memo),
+    )
+    for delta in aegir.watch():
+        for change, records in (("removed", delta.removed), ("added", delta.added)):
+            for record in records:
+                output.write(json.dumps({"change": change, **record._asdict()}) + "\n")
+
+        output.flush()
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = _build_parser()
+    args = parser.parse_args(argv)
+    if args.since is not None and len(args.paths) > 1:
+        parser.error("--since only supports a single project at a time")
+
+    if args.watch:
+        if len(args.paths) > 1 or args.since is not None:
+            parser.error("--watch only supports a single project without --since")
+
+        if args.cache is not None or args.workers != 1:
+            # Only modified files are analysed, within this process
+            parser.error("--watch doesn't support --cache or --workers")
+
+    logging.basicConfig(
+        level=logging.INFO if args.verbose else logging.WARNING, stream=sys.stderr
+    )
+
+    if args.watch:
+        try:
+            if args.output == "-":
+                _watch(args, sys.stdout)
+            else:
+                with open(args.output, "w") as output:
+                    _watch(args, output)
+        except KeyboardInterrupt:
+            pass
+
+        return 0
+
+    try:
+        if args.output == "-":
+            try:
+                found = _stream_errors(args, sys.stdout)
+            except BrokenPipeError:
+                # Whatever we were piped into stopped reading, I.e. head
+                os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+                return 1
+        else:
+            with open(args.output, "w") as output:
+                found = _stream_errors(args, output)
+    except GitError as e:
+        # I.e. an unknown --since revision or not being within a git repository
+        parser.error(str(e))
+
+    return 1 if found else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
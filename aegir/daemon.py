@@ -0,0 +1,235 @@
+"""A long lived analysis daemon serving requests over a unix domain socket.
+
+Requests and responses are both newline delimited json.
+Each request looks like::
+
+    {"id": 1, "source": "...", "bot_variable": "bot"}
+
+For every request the daemon streams back one ``format_error``
+message per error found, followed by a single ``done`` message.
+If the source could not be analysed a ``failure`` message is
+sent in place of ``done``.
+"""
+
+import argparse
+import json
+import logging
+import os
+import signal
+import socket
+import socketserver
+import sys
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterator, Optional, Union
+
+import libcst
+
+from aegir import Aegir
+
+log = logging.getLogger(__name__)
+
+# Parsed on start up so the parser is warm before requests arrive
+_WARM_UP_SOURCE = """
+@bot.event()
+async def on_message(message):
+    await bot.process_commands(message)
+"""
+
+
+def _warm_up() -> None:
+    Aegir.convert_source(_WARM_UP_SOURCE)
+
+
+def _init_worker() -> None:
+    # Interrupts are handled by the daemon which then shuts workers down
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _warm_up()
+
+
+def _convert_source(source: str, bot_variable: Optional[str]) -> dict:
+    try:
+        return Aegir.convert_source(source, bot_variable=bot_variable).serialize()
+    except libcst.ParserSyntaxError as e:
+        return {"failure": str(e)}
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    server: "_DaemonServer"
+
+    def _send(self, data: dict) -> None:
+        self.wfile.write(json.dumps(data).encode() + b"\n")
+        self.wfile.flush()
+
+    def handle(self) -> None:
+        for line in self.rfile:
+            if not line.strip():
+                continue
+
+            try:
+                request = json.loads(line)
+                request_id = request.get("id")
+                source = request["source"]
+            except (ValueError, KeyError, AttributeError):
+                self._send({"type": "failure", "message": "Malformed request."})
+                continue
+
+            future = self.server.executor.submit(
+                _convert_source, source, request.get("bot_variable")
+            )
+            try:
+                result = future.result()
+            except Exception as e:  # Keep serving other requests
+                log.exception("Failed to convert request %s", request_id)
+                result = {"failure": str(e)}
+
+            if "failure" in result:
+                self._send(
+                    {"type": "failure", "id": request_id, "message": result["failure"]}
+                )
+                continue
+
+            for error in result["errors"]:
+                self._send({"type": "format_error", "id": request_id, **error})
+
+            self._send(
+                {
+                    "type": "done",
+                    "id": request_id,
+                    "events": result["events"],
+                    "commands": result["commands"],
+                }
+            )
+
+
+class _DaemonServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, executor: Executor):
+        self.executor: Executor = executor
+        super().__init__(socket_path, _RequestHandler)
+
+
+class AegirDaemon:
+    """Keep a warm interpreter and worker pool around to serve conversions.
+
+    Parameters
+    ----------
+    socket_path: Union[str, Path]
+        The unix domain socket to listen on.
+    workers: Optional[int]
+        How many worker processes to analyse with.
+        Defaults to the number of cpus.
+    """
+
+    def __init__(self, socket_path: Union[str, Path], *, workers: Optional[int] = None):
+        self.socket_path: Path = Path(socket_path)
+        self.workers: Optional[int] = workers
+        self._server: Optional[_DaemonServer] = None
+
+    def serve_forever(self) -> None:
+        """Serve requests until interrupted."""
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGTERM, signal.default_int_handler)
+
+        _warm_up()
+        if self.socket_path.exists():
+            self.socket_path.unlink()
+
+        workers = self.workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker
+        ) as executor:
+            # Workers are otherwise only started once the first request
+            # arrives, from within a request handler's thread
+            for future in [executor.submit(_warm_up) for _ in range(workers)]:
+                future.result()
+
+            self._server = _DaemonServer(str(self.socket_path), executor)
+            log.info("Listening on %s", self.socket_path)
+            try:
+                self._server.serve_forever()
+            except KeyboardInterrupt:
+                pass
+            finally:
+                self._server.server_close()
+                self._server = None
+                self.socket_path.unlink(missing_ok=True)
+
+    def shutdown(self) -> None:
+        """Stop serving, this must be called from another thread."""
+        if self._server is not None:
+            self._server.shutdown()
+
+
+class AegirClient:
+    """A thin client for talking to an :class:`AegirDaemon`."""
+
+    def __init__(self, socket_path: Union[str, Path]):
+        self.socket_path: Path = Path(socket_path)
+        self._next_id: int = 0
+
+    def convert_source(
+        self, source: str, *, bot_variable: Optional[str] = None
+    ) -> Iterator[dict]:
+        """Analyse the given source, yielding messages as they are received."""
+        self._next_id += 1
+        request = {"id": self._next_id, "source": source, "bot_variable": bot_variable}
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(str(self.socket_path))
+            sock.sendall(json.dumps(request).encode() + b"\n")
+            sock.shutdown(socket.SHUT_WR)
+            with sock.makefile("rb") as stream:
+                for line in stream:
+                    message = json.loads(line)
+                    yield message
+                    if message["type"] in ("done", "failure"):
+                        return
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m aegir.daemon",
+        description="Run or query a warm Aegir analysis daemon.",
+    )
+    parser.add_argument(
+        "--socket",
+        default=os.environ.get("AEGIR_SOCKET", "/tmp/aegir.sock"),
+        help="The unix domain socket to use.",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = subparsers.add_parser("serve", help="Start the daemon.")
+    serve_parser.add_argument("--workers", type=int, default=None)
+
+    check_parser = subparsers.add_parser(
+        "check", help="Analyse files using a running daemon."
+    )
+    check_parser.add_argument("files", nargs="+", type=Path)
+    check_parser.add_argument("--bot-variable", default=None)
+
+    args = parser.parse_args(argv)
+    if args.command == "serve":
+        logging.basicConfig(level=logging.INFO)
+        AegirDaemon(args.socket, workers=args.workers).serve_forever()
+        return 0
+
+    client = AegirClient(args.socket)
+    exit_code = 0
+    for file in args.files:
+        for message in client.convert_source(
+            file.read_bytes().decode("utf-8"), bot_variable=args.bot_variable
+        ):
+            message["file"] = str(file)
+            if message["type"] != "done":
+                exit_code = 1
+
+            sys.stdout.write(json.dumps(message) + "\n")
+            sys.stdout.flush()
+
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
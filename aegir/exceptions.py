@@ -13,3 +13,7 @@ class AegirException(Exception):
 
 class InvalidDirPath(AegirException):
     """The given starting path does not exist."""
+
+
+class GitError(AegirException):
+    """Git could not list the files which have changed."""
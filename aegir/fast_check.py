@@ -0,0 +1,360 @@
+"""A cheap first pass over a file using the standard library's ``ast`` module.
+
+This runs the same checks as the built in rules without building a cst,
+I.e. called events, listeners which are not called and ``on_message``
+without ``process_commands``. Files without any of these never need to
+be parsed by libcst, while anything else is left for the full analysis.
+"""
+import ast
+import logging
+from typing import FrozenSet, List, NamedTuple, Optional, Tuple
+
+from aegir.parsed_data import ParsedData
+from aegir.rules import BUILTIN_RULE_IDS, default_registry
+from aegir.util import (
+    DECORATOR_ACTION_TYPES,
+    ActionSummary,
+    ActionType,
+    BotAssignment,
+    DecoratorTable,
+    DecoratorType,
+    RunMode,
+    find_bot_instances,
+    run_calls_for,
+)
+
+log = logging.getLogger(__name__)
+
+
+class _Unsupported(Exception):
+    """Raised for code the full analysis may treat differently, I.e. by raising."""
+
+
+def _last_name(node: ast.expr) -> Optional[str]:
+    if isinstance(node, ast.Name):
+        return node.id
+
+    if isinstance(node, ast.Attribute):
+        return node.attr
+
+    return None
+
+
+def _resolve_name(node: ast.expr) -> str:
+    """The ast equivalent of :func:`aegir.util.resolve_name`."""
+    parts: List[str] = []
+    current = node
+    while True:
+        if isinstance(current, ast.Call):
+            current = current.func
+
+        elif isinstance(current, ast.Name):
+            parts.append(current.id)
+            break
+
+        elif isinstance(current, ast.Attribute):
+            parts.append(current.attr)
+            value = current.value
+            if isinstance(value, ast.Attribute):
+                current = value
+                continue
+
+            if isinstance(value, ast.Name):
+                parts.append(value.id)
+
+            break
+
+        else:
+            raise _Unsupported(type(current).__name__)
+
+    parts.reverse()
+    return ".".join(parts)
+
+
+class _FunctionRecord:
+    __slots__ = ("node", "parent", "processes_commands")
+
+    def __init__(self, node: ast.AsyncFunctionDef, parent: Optional[str]):
+        self.node: ast.AsyncFunctionDef = node
+        self.parent: Optional[str] = parent
+        self.processes_commands: bool = False
+
+
+class _Scanner(ast.NodeVisitor):
+    """Mirrors what :class:`Analyzer` collects, but from an ast."""
+
+    def __init__(self, lines: List[bytes], *, strict: bool = True):
+        self._lines: List[bytes] = lines
+        # Otherwise lines after a line continuation are ignored rather then unsupported
+        self._strict: bool = strict
+        self.records: List[_FunctionRecord] = []
+        # Statements which start a line outside of any function
+        self.statements: List[ast.stmt] = []
+        self.classes: List[Tuple[str, List[str]]] = []
+        self.assignments: List[BotAssignment] = []
+        self._function_stack: List[Optional[_FunctionRecord]] = []
+        self._class_depth: int = 0
+
+    def visit_ClassDef(self, node: ast.ClassDef) -> None:
+        self._class_depth += 1
+        bases = [_last_name(base) for base in node.bases]
+        self.classes.append((node.name, [base for base in bases if base]))
+        self.generic_visit(node)
+        self._class_depth -= 1
+
+    def visit_FunctionDef(self, node: ast.FunctionDef) -> None:
+        self._function_stack.append(None)
+        self.generic_visit(node)
+        self._function_stack.pop()
+
+    def visit_AsyncFunctionDef(self, node: ast.AsyncFunctionDef) -> None:
+        record: Optional[_FunctionRecord] = None
+        if not self._class_depth:
+            if not self._function_stack:
+                record = _FunctionRecord(node, None)
+
+            elif len(self._function_stack) == 1 and self._function_stack[0]:
+                record = _FunctionRecord(node, self._function_stack[0].node.name)
+
+        if record is not None:
+            self.records.append(record)
+
+        self._function_stack.append(record)
+        self.generic_visit(node)
+        self._function_stack.pop()
+
+    def visit_Await(self, node: ast.Await) -> None:
+        self.generic_visit(node)
+        if not self._function_stack:
+            return
+
+        expression = node.value
+        if (
+            not isinstance(expression, ast.Call)
+            or not isinstance(expression.func, ast.Attribute)
+            or expression.func.attr != "process_commands"
+        ):
+            return
+
+        for record in reversed(self._function_stack):
+            if record is not None:
+                record.processes_commands = True
+                break
+
+    def _visit_statement(self, node: ast.stmt) -> None:
+        if not self._function_stack and self._starts_line(node):
+            self.statements.append(node)
+
+        self.generic_visit(node)
+
+    visit_Expr = visit_AugAssign = visit_Return = _visit_statement
+
+    def visit_Assign(self, node: ast.Assign) -> None:
+        for target in node.targets:
+            self._note_assignment(target, node.value)
+
+        self._visit_statement(node)
+
+    def visit_AnnAssign(self, node: ast.AnnAssign) -> None:
+        if node.value is not None:
+            self._note_assignment(node.target, node.value)
+
+        self._visit_statement(node)
+
+    def _note_assignment(self, target: ast.expr, value: ast.expr) -> None:
+        if not isinstance(target, (ast.Name, ast.Attribute)):
+            return
+
+        if isinstance(value, ast.Call):
+            called = _last_name(value.func)
+            if called is not None:
+                self.assignments.append(BotAssignment(target, called, None))
+
+        elif isinstance(value, ast.Name):
+            self.assignments.append(BotAssignment(target, None, value.id))
+
+    def _starts_line(self, node: ast.stmt) -> bool:
+        # libcst only looks at the first statement of each line,
+        # so skip those after a semicolon or a compound statement's colon
+        index = node.lineno - 1
+        if index and self._lines[index - 1].rstrip(b"\r\n").endswith(b"\\"):
+            if not self._strict:
+                return False
+
+            raise _Unsupported("line continuation")
+
+        return not self._lines[index][: node.col_offset].strip()
+
+
+def _parse_run_mode(
+    statements: List[ast.stmt], run_calls: FrozenSet[str]
+) -> Tuple[RunMode, Optional[str]]:
+    for statement in statements:
+        value = statement.value
+        if isinstance(value, ast.Await):
+            value = value.value
+
+        if not isinstance(value, ast.Call):
+            continue
+
+        func_call = _resolve_name(value.func)
+        # libcst counts keyword arguments alongside positional ones
+        arguments = [
+            argument.value if isinstance(argument, ast.Starred) else argument
+            for argument in value.args
+        ]
+        arguments.extend(keyword.value for keyword in value.keywords)
+        if func_call == "asyncio.run":
+            if (
+                len(arguments) != 1
+                or not isinstance(arguments[0], ast.Call)
+                or not isinstance(arguments[0].func, ast.Name)
+            ):
+                continue
+
+            return RunMode.asyncio_run, arguments[0].func.id
+
+        if func_call in run_calls:
+            if len(arguments) != 1:
+                continue
+
+            return RunMode.bot_run, None
+
+    return RunMode.bot_run, None
+
+
+def _has_errors(
+    record: _FunctionRecord,
+    action_type: ActionType,
+    decorators: List[Tuple[ast.expr, DecoratorType]],
+) -> bool:
+    if action_type not in (ActionType.EVENT, ActionType.LISTENER):
+        return False
+
+    for decorator, decor_type in decorators:
+        was_called = isinstance(decorator, ast.Call)
+        if (decor_type == DecoratorType.EVENT and was_called) or (
+            decor_type == DecoratorType.LISTENER and not was_called
+        ):
+            return True
+
+    return (
+        action_type == ActionType.EVENT
+        and record.node.name == "on_message"
+        and not record.processes_commands
+    )
+
+
+class BotUsage(NamedTuple):
+    """The bot instances within a file and how it starts the bot."""
+
+    instances: FrozenSet[str]
+    run_mode: RunMode
+    # What asyncio.run calls if applicable
+    entry_func: Optional[str]
+
+
+def bot_usage(source: str, bot_variable: str) -> Optional[BotUsage]:
+    """Find a file's bot instances and run mode without building a cst.
+
+    Returns None if the file doesn't parse, I.e. mid edit.
+
+    Parameters
+    ----------
+    source: str
+        The file's source code.
+    bot_variable: str
+        The name of the bot variable.
+    """
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return None
+
+    scanner = _Scanner(source.encode().splitlines(), strict=False)
+    try:
+        scanner.visit(tree)
+        instances = find_bot_instances(
+            bot_variable, scanner.classes, scanner.assignments, _resolve_name
+        )
+        run_mode, entry_func = _parse_run_mode(
+            scanner.statements, run_calls_for(instances)
+        )
+    except _Unsupported as e:
+        log.debug("Couldn't find bot instances: %s", e)
+        return None
+
+    return BotUsage(frozenset(instances), run_mode, entry_func)
+
+
+def fast_check(source: str, bot_variable: str) -> Optional[ParsedData]:
+    """Return the analysis of a file which has no errors.
+
+    Returns None when the file may have errors, or uses code only the
+    full analysis knows how to handle, in which case it must be used.
+
+    Parameters
+    ----------
+    source: str
+        The file's source code.
+    bot_variable: str
+        The name of the bot variable.
+    """
+    if not default_registry.rule_ids <= BUILTIN_RULE_IDS:
+        # Other rules may find errors this can't
+        return None
+
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return None
+
+    # ast offsets are in bytes
+    scanner = _Scanner(source.encode().splitlines())
+    try:
+        scanner.visit(tree)
+        instances = find_bot_instances(
+            bot_variable, scanner.classes, scanner.assignments, _resolve_name
+        )
+        table = DecoratorTable(instances, any_instance=not bot_variable)
+        run_mode, entry_func = _parse_run_mode(
+            scanner.statements, run_calls_for(instances)
+        )
+        records = [record for record in scanner.records if record.parent is None]
+        if run_mode == RunMode.asyncio_run:
+            records.extend(
+                record for record in scanner.records if record.parent == entry_func
+            )
+
+        events: List[ActionSummary] = []
+        commands: List[ActionSummary] = []
+        for record in records:
+            function_name = record.node.name
+            if function_name == entry_func:
+                continue
+
+            action_type = ActionType.UNKNOWN
+            decorators: List[Tuple[ast.expr, DecoratorType]] = []
+            for decorator in record.node.decorator_list:
+                decor_type = table.classify(_resolve_name(decorator))
+                if decor_type is not None:
+                    decorators.append((decorator, decor_type))
+                    action_type = DECORATOR_ACTION_TYPES.get(decor_type, action_type)
+
+            if _has_errors(record, action_type, decorators):
+                return None
+
+            if action_type == ActionType.UNKNOWN:
+                log.warning(
+                    "Couldn't figure out what type of action '%s' was", function_name
+                )
+            elif action_type == ActionType.COMMAND:
+                commands.append(ActionSummary(function_name, action_type))
+            else:
+                events.append(ActionSummary(function_name, action_type))
+
+    except (_Unsupported, RecursionError) as e:
+        log.debug("Leaving the file to the full analysis: %s", e)
+        return None
+
+    return ParsedData(commands=commands, events=events, errors=[])
@@ -0,0 +1,85 @@
+import difflib
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict, Iterable, Union
+
+import libcst
+
+from aegir import FormatError
+
+
+class FixApplier(libcst.CSTTransformer):
+    """Apply the fixes for many errors to a module in a single pass.
+
+    Errors are matched to nodes by identity, so they must
+    have been generated from the module being transformed.
+    """
+
+    def __init__(self, errors: Iterable[FormatError]):
+        super().__init__()
+        # Errors keep their nodes alive, so ids remain unique
+        self._fixes: Dict[int, FormatError] = {
+            id(error.old_cst): error
+            for error in errors
+            if error.old_cst is not None and error.fixed_cst is not None
+        }
+        self.applied: int = 0
+
+    def on_leave(self, original_node, updated_node):
+        error = self._fixes.get(id(original_node))
+        if error is None or error.old_cst is not original_node:
+            return updated_node
+
+        self.applied += 1
+        fixed_cst = error.fixed_cst
+        if (
+            isinstance(original_node, libcst.FunctionDef)
+            and updated_node is not original_node
+        ):
+            # Keep any fixes already applied to this function's decorators
+            fixed_cst = fixed_cst.with_changes(decorators=updated_node.decorators)
+
+        return fixed_cst
+
+
+def apply_fixes(module: libcst.Module, errors: Iterable[FormatError]) -> libcst.Module:
+    """Return the module with every fix applied."""
+    return module.visit(FixApplier(errors))
+
+
+def unified_diff(old: str, new: str, file_path: Union[str, Path]) -> str:
+    """Return a unified diff between two versions of a file."""
+    return "".join(
+        difflib.unified_diff(
+            old.splitlines(keepends=True),
+            new.splitlines(keepends=True),
+            fromfile=f"a/{file_path}",
+            tofile=f"b/{file_path}",
+        )
+    )
+
+
+def write_atomically(file_path: Path, content: Union[str, bytes]) -> None:
+    """Replace a file's content without ever leaving it partially written."""
+    file_descriptor, temp_path = tempfile.mkstemp(
+        dir=file_path.parent, prefix=f".{file_path.name}.", suffix=".tmp"
+    )
+    try:
+        if isinstance(content, bytes):
+            file = os.fdopen(file_descriptor, "wb")
+        else:
+            file = os.fdopen(file_descriptor, "w", encoding="utf-8", newline="")
+
+        with file:
+            file.write(content)
+
+        try:
+            os.chmod(temp_path, file_path.stat().st_mode)
+        except FileNotFoundError:
+            pass
+
+        os.replace(temp_path, file_path)
+    except BaseException:
+        Path(temp_path).unlink(missing_ok=True)
+        raise
@@ -1,13 +1,84 @@
+from typing import NamedTuple, Optional
+
+import libcst
+from libcst.metadata import CodePosition, CodeRange
+
+_EMPTY_MODULE = libcst.Module(body=[])
+
+
+class ErrorRecord(NamedTuple):
+    """A compact, cst free record of a :class:`FormatError`.
+
+    Lines are one indexed and columns zero indexed,
+    positions are None when they are unknown.
+    """
+
+    file_path: Optional[str]
+    line: Optional[int]
+    column: Optional[int]
+    end_line: Optional[int]
+    end_column: Optional[int]
+    rule_id: str
+    title: str
+    replacement: Optional[str]
+
+
 class FormatError:
-    def __init__(self, *, title: str, description: str, old_cst, fixed_cst):
+    def __init__(
+        self,
+        *,
+        title: str,
+        description: str,
+        rule_id: str = "unknown",
+        old_cst=None,
+        fixed_cst=None,
+        old_code: Optional[str] = None,
+        fixed_code: Optional[str] = None,
+        position: Optional[CodeRange] = None,
+    ):
         self.title: str = title
         self.description: str = description
+        self.rule_id: str = rule_id
         self.old_cst = old_cst
         self.fixed_cst = fixed_cst
+        self._old_code: Optional[str] = old_code
+        self._fixed_code: Optional[str] = fixed_code
+        self._position: Optional[CodeRange] = position
+        # Set to a LazyPositions when this error can be located
+        self._positions = None
 
     def __repr__(self):
         return f"FormatError(title='{self.title}')"
 
+    @property
+    def old_code(self) -> Optional[str]:
+        """The source code this error was raised for."""
+        if self._old_code is None and self.old_cst is not None:
+            self._old_code = _EMPTY_MODULE.code_for_node(self.old_cst)
+
+        return self._old_code
+
+    @property
+    def fixed_code(self) -> Optional[str]:
+        """The source code which fixes this error."""
+        if self._fixed_code is None and self.fixed_cst is not None:
+            self._fixed_code = _EMPTY_MODULE.code_for_node(self.fixed_cst)
+
+        return self._fixed_code
+
+    @property
+    def position(self) -> Optional[CodeRange]:
+        """Where this error is within its file, lines are one indexed.
+
+        This is computed on first access, and only
+        for files which actually have errors.
+        """
+        if self._position is None and self._positions is not None:
+            self._position = self._positions.position_for(self.old_cst)
+            self._positions = None
+
+        return self._position
+
     def as_dict(self) -> dict:
         return {
             "title": self.title,
@@ -15,3 +86,60 @@ class FormatError:
             "old_cst": self.old_cst,
             "fixed_cst": self.fixed_cst,
         }
+
+    def compact(self, file_path: Optional[str] = None) -> ErrorRecord:
+        """Return a cst free record of this error."""
+        position = self.position
+        return ErrorRecord(
+            file_path=file_path,
+            line=position.start.line if position else None,
+            column=position.start.column if position else None,
+            end_line=position.end.line if position else None,
+            end_column=position.end.column if position else None,
+            rule_id=self.rule_id,
+            title=self.title,
+            replacement=self.fixed_code,
+        )
+
+    def serialize(self) -> dict:
+        """Return a json safe representation of this error."""
+        position = self.position
+        return {
+            "rule_id": self.rule_id,
+            "title": self.title,
+            "description": self.description,
+            "old_code": self.old_code,
+            "fixed_code": self.fixed_code,
+            "position": (
+                [
+                    position.start.line,
+                    position.start.column,
+                    position.end.line,
+                    position.end.column,
+                ]
+                if position
+                else None
+            ),
+        }
+
+    @classmethod
+    def deserialize(cls, data: dict) -> "FormatError":
+        """Build an error from the output of :meth:`serialize`.
+
+        The returned error will not have any cst attached.
+        """
+        position: Optional[CodeRange] = None
+        if data.get("position"):
+            line, column, end_line, end_column = data["position"]
+            position = CodeRange(
+                CodePosition(line, column), CodePosition(end_line, end_column)
+            )
+
+        return cls(
+            title=data["title"],
+            description=data["description"],
+            rule_id=data.get("rule_id", "unknown"),
+            old_code=data["old_code"],
+            fixed_code=data["fixed_code"],
+            position=position,
+        )
@@ -0,0 +1,266 @@
+"""Find which project files the bot can actually load, starting from its main file.
+
+Files are scanned with the standard library's ``ast`` module, which is far
+cheaper than building a cst, so files which are never loaded never get parsed
+by libcst. Edges come from imports and ``load_extension`` style calls.
+"""
+import ast
+import logging
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+log = logging.getLogger(__name__)
+
+_LOAD_EXTENSION = frozenset(
+    {"load_extension", "load_extensions", "reload_extension", "reload_extensions"}
+)
+# Loads every extension within a package
+_LOAD_PACKAGE = "load_extensions_from_module"
+
+
+class FileReferences(NamedTuple):
+    """The modules a single file may cause to be loaded."""
+
+    # Absolute module names, which may or may not be within the project
+    modules: Tuple[str, ...]
+    # Packages which every module within may be loaded from
+    packages: Tuple[str, ...]
+    # Strings which may name an extension when it is loaded from a variable
+    dynamic: Tuple[str, ...]
+    # Whether an extension is loaded from something which isn't a string
+    has_dynamic: bool
+
+
+class _ReferenceScanner(ast.NodeVisitor):
+    def __init__(self, package: str):
+        self._package: str = package
+        self.modules: List[str] = []
+        self.packages: List[str] = []
+        self.strings: List[str] = []
+        self.has_dynamic: bool = False
+
+    def visit_Import(self, node: ast.Import) -> None:
+        for alias in node.names:
+            self.modules.append(alias.name)
+
+    def visit_ImportFrom(self, node: ast.ImportFrom) -> None:
+        base = node.module or ""
+        if node.level:
+            parts = self._package.split(".") if self._package else []
+            if node.level - 1 > len(parts):
+                return
+
+            parts = parts[: len(parts) - (node.level - 1)]
+            base = ".".join(part for part in (*parts, base) if part)
+
+        if base:
+            self.modules.append(base)
+
+        for alias in node.names:
+            if alias.name != "*":
+                # This may be a submodule rather than a name within base
+                self.modules.append(f"{base}.{alias.name}" if base else alias.name)
+
+    def visit_Constant(self, node: ast.Constant) -> None:
+        if isinstance(node.value, str):
+            self.strings.append(node.value)
+
+    def visit_Call(self, node: ast.Call) -> None:
+        func = node.func
+        name = func.attr if isinstance(func, ast.Attribute) else getattr(func, "id", "")
+        if name in _LOAD_EXTENSION or name == _LOAD_PACKAGE:
+            for argument in node.args[:1]:
+                self._add_extension(argument, is_package=name == _LOAD_PACKAGE)
+
+        self.generic_visit(node)
+
+    def _add_extension(self, argument: ast.expr, *, is_package: bool) -> None:
+        if isinstance(argument, (ast.List, ast.Tuple, ast.Set)):
+            for element in argument.elts:
+                self._add_extension(element, is_package=is_package)
+            return
+
+        if isinstance(argument, ast.Constant) and isinstance(argument.value, str):
+            if is_package:
+                self.packages.append(argument.value)
+            else:
+                self.modules.append(argument.value)
+            return
+
+        # I.e. f"cogs.{name}" or "cogs." + name
+        prefix: Optional[str] = None
+        if isinstance(argument, ast.JoinedStr) and argument.values:
+            first = argument.values[0]
+            if isinstance(first, ast.Constant) and isinstance(first.value, str):
+                prefix = first.value
+
+        elif (
+            isinstance(argument, ast.BinOp)
+            and isinstance(argument.op, ast.Add)
+            and isinstance(argument.left, ast.Constant)
+            and isinstance(argument.left.value, str)
+        ):
+            prefix = argument.left.value
+
+        if prefix and prefix.endswith("."):
+            self.packages.append(prefix[:-1])
+        else:
+            self.has_dynamic = True
+
+
+def scan_file(source: str, package: str) -> Optional[FileReferences]:
+    """Return what the given source may load, or None if it does not parse.
+
+    Parameters
+    ----------
+    source: str
+        The file's source code.
+    package: str
+        The package the file is within, used for relative imports.
+    """
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return None
+
+    scanner = _ReferenceScanner(package)
+    scanner.visit(tree)
+    return FileReferences(
+        modules=tuple(scanner.modules),
+        packages=tuple(scanner.packages),
+        dynamic=tuple(scanner.strings) if scanner.has_dynamic else (),
+        has_dynamic=scanner.has_dynamic,
+    )
+
+
+class ImportGraph:
+    """Resolves what a project's files load in terms of the project's files.
+
+    Parameters
+    ----------
+    roots: Iterable[Path]
+        The directories modules are imported relative to,
+        I.e. the directory the bot is run from.
+    files: Iterable[Path]
+        Every python file within the project.
+    """
+
+    def __init__(self, roots: Iterable[Path], files: Iterable[Path]):
+        self.roots: List[Path] = list(roots)
+        self._modules: Dict[str, Path] = {}
+        self._names: Dict[Path, str] = {}
+        # Scans are reused while a file's modification time and size are unchanged
+        self._scans: Dict[Path, Tuple[Tuple[int, int], Optional[FileReferences]]] = {}
+        self.update(files)
+
+    def update(self, files: Iterable[Path]) -> None:
+        """Replace the files making up the project."""
+        self._modules = {}
+        self._names = {}
+        for file in files:
+            name = self.module_for(file)
+            if name is not None:
+                self._modules.setdefault(name, file)
+                self._names[file] = name
+
+    def module_for(self, file: Path) -> Optional[str]:
+        """Return the module name for a file, if it is within a root."""
+        for root in self.roots:
+            try:
+                parts = list(file.relative_to(root).with_suffix("").parts)
+            except ValueError:
+                continue
+
+            if parts and parts[-1] == "__init__":
+                parts.pop()
+
+            return ".".join(parts)
+
+        return None
+
+    def resolve(self, name: str) -> List[Path]:
+        """Return the project files importing this module loads.
+
+        This includes the ``__init__.py`` of each parent package.
+        """
+        files: List[Path] = []
+        parts = name.split(".")
+        for index in range(1, len(parts) + 1):
+            file = self._modules.get(".".join(parts[:index]))
+            if file is not None:
+                files.append(file)
+
+        return files
+
+    def _references_for(self, file: Path) -> Optional[FileReferences]:
+        try:
+            stat = file.stat()
+            stamp = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            return None
+
+        cached = self._scans.get(file)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+
+        name = self._names.get(file, "")
+        package = name if file.name == "__init__.py" else name.rpartition(".")[0]
+        try:
+            references = scan_file(file.read_bytes().decode("utf-8"), package)
+        except (OSError, UnicodeDecodeError):
+            references = None
+
+        self._scans[file] = (stamp, references)
+        return references
+
+    def reachable(self, entry: Path) -> Optional[Set[Path]]:
+        """Return every project file reachable from entry.
+
+        Returns None when an extension is loaded in a way which
+        can't be resolved, in which case anything may be loaded.
+        """
+        seen: Set[Path] = {entry}
+        stack: List[Path] = [entry]
+        while stack:
+            file = stack.pop()
+            references = self._references_for(file)
+            if references is None:
+                continue
+
+            found: List[Path] = []
+            for module in references.modules:
+                found.extend(self.resolve(module))
+
+            for package in references.packages:
+                found.extend(self.resolve(package))
+                prefix = f"{package}."
+                found.extend(
+                    path
+                    for name, path in self._modules.items()
+                    if name.startswith(prefix)
+                )
+
+            if references.has_dynamic:
+                # I.e. loading each name within a list of extension names
+                dynamic = [
+                    path
+                    for string in references.dynamic
+                    if string in self._modules
+                    for path in self.resolve(string)
+                ]
+                if not dynamic:
+                    log.info(
+                        "'%s' loads extensions which can't be resolved, "
+                        "so every file is treated as reachable",
+                        file,
+                    )
+                    return None
+
+                found.extend(dynamic)
+
+            for path in found:
+                if path not in seen:
+                    seen.add(path)
+                    stack.append(path)
+
+        return seen
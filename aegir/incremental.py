@@ -0,0 +1,148 @@
+"""Support for only analysing the files changed since a git revision."""
+import hashlib
+import json
+import logging
+import subprocess
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+from aegir.exceptions import GitError
+from aegir.fixer import write_atomically
+from aegir.format_error import ErrorRecord
+
+log = logging.getLogger(__name__)
+
+
+def _git(directory: Path, *args: str) -> List[str]:
+    try:
+        process = subprocess.run(
+            ["git", *args],
+            cwd=directory,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except FileNotFoundError as e:
+        raise GitError("Git is not installed.") from e
+    except subprocess.CalledProcessError as e:
+        raise GitError(f"git {args[0]} failed: {e.stderr.strip()}") from e
+
+    return [line for line in process.stdout.splitlines() if line]
+
+
+def changed_files(directory: Path, base_revision: str) -> Set[Path]:
+    """Return the python files under directory changed since base_revision.
+
+    This includes uncommitted and untracked files but not deleted ones.
+    """
+    names = _git(
+        directory,
+        "diff",
+        "--name-only",
+        "--relative",
+        "--diff-filter=d",
+        base_revision,
+        "--",
+        "*.py",
+    )
+    names.extend(
+        _git(directory, "ls-files", "--others", "--exclude-standard", "--", "*.py")
+    )
+    return {(directory / name).absolute() for name in names}
+
+
+class Report:
+    """The errors previously found for each file in a project.
+
+    Parameters
+    ----------
+    files: Dict[str, List[ErrorRecord]]
+        Each file's errors, keyed by the file's path.
+    stamp: str
+        Identifies the settings the report was made with,
+        a report with a different stamp is never reused.
+    digests: Optional[Dict[str, str]]
+        A hash of the content each file's errors were found in,
+        see :meth:`digest_for`. Errors are only reused for
+        files whose content still has the same hash.
+    """
+
+    def __init__(
+        self,
+        files: Dict[str, List[ErrorRecord]],
+        *,
+        stamp: str,
+        digests: Optional[Dict[str, str]] = None,
+    ):
+        self.files: Dict[str, List[ErrorRecord]] = files
+        self.stamp: str = stamp
+        self.digests: Dict[str, str] = digests or {}
+
+    @staticmethod
+    def digest_for(source: bytes) -> str:
+        return hashlib.sha256(source).hexdigest()
+
+    def is_current(self, file: str, digest: Optional[str]) -> bool:
+        """Return whether the stored errors for a file were found in this content."""
+        return (
+            digest is not None
+            and file in self.files
+            and self.digests.get(file) == digest
+        )
+
+    def set(self, file: str, records: List[ErrorRecord], digest: Optional[str]) -> None:
+        """Store a file's errors alongside the hash of the content they were found in."""
+        self.files[file] = records
+        if digest is None:
+            self.digests.pop(file, None)
+        else:
+            self.digests[file] = digest
+
+    def discard(self, file: str) -> None:
+        """Forget a file, so it is analysed again next time."""
+        self.files.pop(file, None)
+        self.digests.pop(file, None)
+
+    @classmethod
+    def load(cls, path: Path, *, stamp: str) -> "Report":
+        """Load a stored report, returning an empty one if it is unusable."""
+        try:
+            data = json.loads(path.read_text())
+        except FileNotFoundError:
+            return cls({}, stamp=stamp)
+        except (OSError, ValueError) as e:
+            log.warning("Ignoring unreadable report '%s': %s", path, e)
+            return cls({}, stamp=stamp)
+
+        if data.get("stamp") != stamp:
+            log.info("Ignoring report '%s' made with other settings", path)
+            return cls({}, stamp=stamp)
+
+        return cls(
+            {
+                file: [ErrorRecord(**record) for record in records]
+                for file, records in data["files"].items()
+            },
+            stamp=stamp,
+            # Reports without digests are never reused
+            digests=data.get("digests"),
+        )
+
+    def save(self, path: Path) -> None:
+        data = {
+            "stamp": self.stamp,
+            "files": {
+                file: [record._asdict() for record in records]
+                for file, records in self.files.items()
+            },
+            "digests": self.digests,
+        }
+        write_atomically(path, json.dumps(data, indent=2))
+
+    def errors(self, files: Iterable[str]) -> List[ErrorRecord]:
+        """Return the errors for the given files, in the order given."""
+        errors: List[ErrorRecord] = []
+        for file in files:
+            errors.extend(self.files.get(file, ()))
+
+        return errors
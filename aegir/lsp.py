@@ -0,0 +1,463 @@
+"""A language server publishing Aegir's errors as diagnostics over stdio.
+
+Documents are split into top level blocks, I.e. a function alongside its
+decorators, and each block is analysed on its own. Bot instances are
+found once for the whole document and given to every block, so a bot
+created in one block is known within the others. After an edit only
+blocks whose text changed are parsed again, everything else reuses
+the previous results. Each diagnostic offers a quick fix.
+
+Positions sent to and from clients count columns in UTF-16 code units,
+as the protocol requires, while Aegir counts them in code points.
+
+Run it with ``python -m aegir.lsp``.
+"""
+import argparse
+import json
+import logging
+import sys
+from typing import AbstractSet, BinaryIO, Dict, List, Optional, Tuple
+
+import libcst
+
+from aegir import Aegir, FormatError, SourceFile
+from aegir.fast_check import BotUsage, bot_usage
+from aegir.fixer import apply_fixes
+from aegir.util import RunMode
+
+log = logging.getLogger(__name__)
+
+# Lines at column 0 which continue the statement before them
+_CONTINUATIONS = ("else", "elif", "except", "finally", ")", "]", "}")
+# How many following blocks to try merging an unparsable block with,
+# I.e. when a multi-line string has lines at column 0
+_MAX_MERGE = 8
+_WARNING = 2
+
+
+def split_blocks(text: str) -> List[Tuple[int, str]]:
+    """Split source into top level blocks, returning each alongside its first line.
+
+    This only looks at the start of each line, blocks which
+    don't parse are merged with their neighbours later on.
+    """
+    lines = text.splitlines(keepends=True)
+    blocks: List[Tuple[int, str]] = []
+    start = 0
+    after_decorator = False
+    for index in range(1, len(lines)):
+        line = lines[index]
+        first = line[:1]
+        if not first or first in " \t\r\n#":
+            continue
+
+        if (
+            after_decorator
+            or line.startswith(_CONTINUATIONS)
+            or lines[index - 1].rstrip("\r\n").endswith("\\")
+        ):
+            after_decorator = first == "@"
+            continue
+
+        blocks.append((start, "".join(lines[start:index])))
+        start = index
+        after_decorator = first == "@"
+
+    if start < len(lines):
+        blocks.append((start, "".join(lines[start:])))
+
+    return blocks
+
+
+class _BlockAnalysis:
+    """The analysis of a single block, positions are relative to the block."""
+
+    __slots__ = ("module", "errors", "lines")
+
+    def __init__(self, text: str, module: libcst.Module, errors: List[FormatError]):
+        self.module: libcst.Module = module
+        self.errors: List[FormatError] = errors
+        self.lines: List[str] = text.split("\n")
+
+
+def _analyse_block(
+    text: str, bot_variable: str, instances: AbstractSet[str]
+) -> Optional[_BlockAnalysis]:
+    source_file = SourceFile(
+        text, backref=Aegir, bot_variable=bot_variable, known_instances=instances
+    )
+    try:
+        parsed_data = source_file.convert()
+    except libcst.ParserSyntaxError:
+        return None
+
+    return _BlockAnalysis(text, source_file.file_cst, parsed_data.errors)
+
+
+def _utf16_column(line: str, column: int) -> int:
+    """Convert a column in code points to one in UTF-16 code units."""
+    return len(line[:column].encode("utf-16-le")) // 2
+
+
+def _code_point_column(line: str, character: int) -> int:
+    """Convert a column in UTF-16 code units to one in code points."""
+    units = 0
+    for index, char in enumerate(line):
+        if units >= character:
+            return index
+
+        # Characters outside of the basic multilingual plane are a surrogate pair
+        units += 2 if ord(char) > 0xFFFF else 1
+
+    return len(line)
+
+
+def _position_to_offset(text: str, position: dict) -> int:
+    offset = 0
+    for _ in range(position["line"]):
+        offset = text.find("\n", offset) + 1
+        if not offset:
+            return len(text)
+
+    line_end = text.find("\n", offset)
+    line = text[offset:] if line_end == -1 else text[offset:line_end]
+    return offset + _code_point_column(line, position["character"])
+
+
+def _lsp_range(start_line: int, start_column: int, end_line: int, end_column: int):
+    return {
+        "start": {"line": start_line, "character": start_column},
+        "end": {"line": end_line, "character": end_column},
+    }
+
+
+class Document:
+    """The warm model of a single open document.
+
+    Parameters
+    ----------
+    text: str
+        The document's content.
+    bot_variable: str
+        The name of the bot variable, empty to treat any as the bot.
+    """
+
+    def __init__(self, text: str, *, bot_variable: str = ""):
+        self.text: str = text
+        self.bot_variable: str = bot_variable
+        # Results keyed by block text, so only changed blocks are analysed
+        self._analyses: Dict[str, Optional[_BlockAnalysis]] = {}
+        # Kept from the last time the whole document parsed
+        self._usage: Optional[BotUsage] = None
+        self.blocks: List[Tuple[int, _BlockAnalysis]] = []
+        self.analysed_blocks: int = 0
+        self.update()
+
+    def apply_change(self, change: dict) -> None:
+        """Apply a change from a ``textDocument/didChange`` notification."""
+        if "range" not in change:
+            self.text = change["text"]
+            return
+
+        start = _position_to_offset(self.text, change["range"]["start"])
+        end = _position_to_offset(self.text, change["range"]["end"])
+        self.text = self.text[:start] + change["text"] + self.text[end:]
+
+    def _analysis_for(self, text: str) -> Optional[_BlockAnalysis]:
+        if text not in self._analyses:
+            self._analyses[text] = _analyse_block(
+                text,
+                self.bot_variable,
+                self._usage.instances if self._usage is not None else frozenset(),
+            )
+            self.analysed_blocks += 1
+
+        return self._analyses[text]
+
+    def update(self) -> None:
+        """Re-analyse every block whose text changed since the last update."""
+        usage = bot_usage(self.text, self.bot_variable)
+        if usage is not None and usage != self._usage:
+            if self._usage is None or usage.instances != self._usage.instances:
+                # Every block was analysed with the old instances
+                self._analyses = {}
+
+            self._usage = usage
+
+        if self._usage is not None and self._usage.run_mode == RunMode.asyncio_run:
+            # Handlers are within the entry function, which needs the whole file
+            blocks = [(0, self.text)]
+        else:
+            blocks = split_blocks(self.text)
+
+        analyses: Dict[str, Optional[_BlockAnalysis]] = {}
+        self.blocks = []
+        index = 0
+        while index < len(blocks):
+            start, text = blocks[index]
+            analysis = self._analysis_for(text)
+            analyses[text] = analysis
+            merged = 0
+            while analysis is None and merged < _MAX_MERGE:
+                merged += 1
+                if index + merged >= len(blocks):
+                    break
+
+                text += blocks[index + merged][1]
+                analysis = self._analysis_for(text)
+                analyses[text] = analysis
+
+            if analysis is None:
+                # Most likely mid edit, so leave this block without diagnostics
+                index += 1
+                continue
+
+            self.blocks.append((start, analysis))
+            index += merged + 1
+
+        # Only keep results for blocks which still exist
+        self._analyses = analyses
+
+    def diagnostics(self) -> List[dict]:
+        diagnostics: List[dict] = []
+        for start, analysis in self.blocks:
+            for error in analysis.errors:
+                diagnostic = self._diagnostic_for(start, analysis, error)
+                if diagnostic is not None:
+                    diagnostics.append(diagnostic)
+
+        return diagnostics
+
+    @staticmethod
+    def _diagnostic_for(
+        start: int, analysis: _BlockAnalysis, error: FormatError
+    ) -> Optional[dict]:
+        position = error.position
+        if position is None:
+            return None
+
+        return {
+            "range": _lsp_range(
+                start + position.start.line - 1,
+                _utf16_column(
+                    analysis.lines[position.start.line - 1], position.start.column
+                ),
+                start + position.end.line - 1,
+                _utf16_column(
+                    analysis.lines[position.end.line - 1], position.end.column
+                ),
+            ),
+            "severity": _WARNING,
+            "source": "aegir",
+            "code": error.rule_id,
+            "message": f"{error.title} {error.description}",
+        }
+
+    def code_actions(self, uri: str, lsp_range: dict) -> List[dict]:
+        """Return a quick fix for every error overlapping the given range."""
+        first_line = lsp_range["start"]["line"]
+        last_line = lsp_range["end"]["line"]
+        actions: List[dict] = []
+        for start, analysis in self.blocks:
+            for error in analysis.errors:
+                diagnostic = self._diagnostic_for(start, analysis, error)
+                if (
+                    diagnostic is None
+                    or error.fixed_cst is None
+                    or diagnostic["range"]["end"]["line"] < first_line
+                    or diagnostic["range"]["start"]["line"] > last_line
+                ):
+                    continue
+
+                # Replacing the whole block keeps edits exact regardless
+                # of how much surrounding whitespace the fix covers
+                final_line = analysis.lines[-1]
+                block_range = _lsp_range(
+                    start,
+                    0,
+                    start + len(analysis.lines) - 1,
+                    _utf16_column(final_line, len(final_line)),
+                )
+
+                fixed_text = apply_fixes(analysis.module, [error]).code
+                actions.append(
+                    {
+                        "title": f"Aegir: {error.title}",
+                        "kind": "quickfix",
+                        "diagnostics": [diagnostic],
+                        "isPreferred": True,
+                        "edit": {
+                            "changes": {
+                                uri: [{"range": block_range, "newText": fixed_text}]
+                            }
+                        },
+                    }
+                )
+
+        return actions
+
+
+class LanguageServer:
+    """A minimal language server speaking json-rpc over a pair of streams.
+
+    Parameters
+    ----------
+    reader: BinaryIO
+        Where requests are read from, usually stdin.
+    writer: BinaryIO
+        Where responses are written to, usually stdout.
+    bot_variable: str
+        The default bot variable, clients may override
+        this with the ``botVariable`` initialization option.
+    """
+
+    def __init__(self, reader: BinaryIO, writer: BinaryIO, *, bot_variable: str = ""):
+        self._reader: BinaryIO = reader
+        self._writer: BinaryIO = writer
+        self.bot_variable: str = bot_variable
+        self.documents: Dict[str, Document] = {}
+        self._shutdown: bool = False
+
+    def _read_message(self) -> Optional[dict]:
+        content_length: Optional[int] = None
+        while True:
+            line = self._reader.readline()
+            if not line:
+                return None
+
+            line = line.strip()
+            if not line:
+                break
+
+            name, _, value = line.decode("ascii").partition(":")
+            if name.lower() == "content-length":
+                content_length = int(value.strip())
+
+        if content_length is None:
+            return None
+
+        return json.loads(self._reader.read(content_length))
+
+    def _send(self, message: dict) -> None:
+        message["jsonrpc"] = "2.0"
+        body = json.dumps(message).encode()
+        self._writer.write(b"Content-Length: %d\r\n\r\n" % len(body) + body)
+        self._writer.flush()
+
+    def _publish(self, uri: str) -> None:
+        document = self.documents.get(uri)
+        self._send(
+            {
+                "method": "textDocument/publishDiagnostics",
+                "params": {
+                    "uri": uri,
+                    "diagnostics": document.diagnostics() if document else [],
+                },
+            }
+        )
+
+    def serve(self) -> int:
+        """Handle messages till the client exits, returning the exit code."""
+        while True:
+            message = self._read_message()
+            if message is None:
+                return 1
+
+            method = message.get("method")
+            if method == "exit":
+                return 0 if self._shutdown else 1
+
+            try:
+                result = self.handle(method, message.get("params") or {})
+            except Exception as e:  # Keep serving other requests
+                log.exception("Failed to handle %s", method)
+                if "id" in message:
+                    self._send(
+                        {
+                            "id": message["id"],
+                            "error": {"code": -32603, "message": str(e)},
+                        }
+                    )
+                continue
+
+            if "id" not in message:
+                continue
+
+            if result is NotImplemented:
+                self._send(
+                    {
+                        "id": message["id"],
+                        "error": {"code": -32601, "message": f"Unknown {method}"},
+                    }
+                )
+            else:
+                self._send({"id": message["id"], "result": result})
+
+    def handle(self, method: Optional[str], params: dict):
+        """Handle a single request or notification, returning its result."""
+        if method == "initialize":
+            options = params.get("initializationOptions") or {}
+            self.bot_variable = options.get("botVariable", self.bot_variable)
+            return {
+                "capabilities": {
+                    # Incremental changes
+                    "textDocumentSync": {"openClose": True, "change": 2},
+                    "codeActionProvider": {"codeActionKinds": ["quickfix"]},
+                },
+                "serverInfo": {"name": "aegir"},
+            }
+
+        if method == "shutdown":
+            self._shutdown = True
+            return None
+
+        if method == "textDocument/didOpen":
+            document = params["textDocument"]
+            self.documents[document["uri"]] = Document(
+                document["text"], bot_variable=self.bot_variable
+            )
+            self._publish(document["uri"])
+
+        elif method == "textDocument/didChange":
+            uri = params["textDocument"]["uri"]
+            document = self.documents[uri]
+            for change in params["contentChanges"]:
+                document.apply_change(change)
+
+            document.update()
+            self._publish(uri)
+
+        elif method == "textDocument/didClose":
+            uri = params["textDocument"]["uri"]
+            self.documents.pop(uri, None)
+            self._publish(uri)
+
+        elif method == "textDocument/codeAction":
+            document = self.documents.get(params["textDocument"]["uri"])
+            if document is None:
+                return []
+
+            return document.code_actions(params["textDocument"]["uri"], params["range"])
+
+        elif method != "initialized" and not (method or "").startswith("$/"):
+            return NotImplemented
+
+        return None
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m aegir.lsp",
+        description="Run Aegir as a language server over stdio.",
+    )
+    parser.add_argument("--bot-variable", default="")
+    args = parser.parse_args(argv)
+    # Stdout is reserved for the protocol
+    logging.basicConfig(level=logging.WARNING, stream=sys.stderr)
+    return LanguageServer(
+        sys.stdin.buffer, sys.stdout.buffer, bot_variable=args.bot_variable
+    ).serve()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,154 @@
+import hashlib
+import json
+import logging
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import NamedTuple, Optional, Tuple, Union
+
+import libcst
+
+from aegir.cache import _version_stamp
+from aegir.fixer import write_atomically
+
+log = logging.getLogger(__name__)
+
+_EMPTY_MODULE = libcst.Module(body=[])
+# Bumped whenever FunctionSummary changes
+_FORMAT = 4
+
+
+class FunctionSummary(NamedTuple):
+    """Everything Aegir learnt from analysing a single function."""
+
+    # The resolved name of each decorator, these are classified
+    # per file as which names are bot instances may differ
+    decorator_names: Tuple[str, ...]
+    processes_commands: bool
+    # Whether the body must still be visited, I.e. for imports, nested
+    # functions or assignments which may create a bot instance
+    visit_body: bool
+
+
+class FunctionMemo:
+    """A least recently used memo of per function analysis.
+
+    Functions are keyed by a hash of their code and the bot variable,
+    so unchanged or duplicated functions skip being analysed again.
+
+    Parameters
+    ----------
+    capacity: int
+        The maximum amount of functions to remember.
+    path: Optional[Union[str, Path]]
+        If given, the memo is loaded from this json file on
+        first use and written back to it by :meth:`save`.
+    """
+
+    def __init__(
+        self, capacity: int = 8192, *, path: Optional[Union[str, Path]] = None
+    ):
+        self.capacity: int = capacity
+        self.path: Optional[Path] = Path(path) if path is not None else None
+        self.hits: int = 0
+        self.misses: int = 0
+        self._entries: Optional[OrderedDict[bytes, FunctionSummary]] = None
+        self._dirty: bool = False
+        self._lock: threading.Lock = threading.Lock()
+
+    def __repr__(self):
+        return (
+            f"FunctionMemo(size={len(self)}, capacity={self.capacity}, "
+            f"hits={self.hits}, misses={self.misses})"
+        )
+
+    def __len__(self):
+        return len(self._entries) if self._entries is not None else 0
+
+    def __getstate__(self):
+        raise TypeError("FunctionMemo's are only usable within a single process")
+
+    def _load(self) -> OrderedDict[bytes, FunctionSummary]:
+        if self._entries is not None:
+            return self._entries
+
+        self._entries = OrderedDict()
+        if self.path is None:
+            return self._entries
+
+        try:
+            data = json.loads(self.path.read_text())
+            if (
+                data.get("stamp") != _version_stamp().decode()
+                or data.get("format") != _FORMAT
+            ):
+                return self._entries
+
+            entries = [
+                (
+                    bytes.fromhex(key),
+                    FunctionSummary(tuple(decorator_names), *flags),
+                )
+                for key, (decorator_names, *flags) in data["entries"].items()
+            ]
+        except FileNotFoundError:
+            return self._entries
+        except (OSError, ValueError, TypeError, KeyError, AttributeError) as e:
+            log.warning("Ignoring unreadable function memo '%s': %s", self.path, e)
+            return self._entries
+
+        self._entries.update(entries)
+        return self._entries
+
+    @staticmethod
+    def key_for(node: libcst.FunctionDef, bot_variable: str) -> bytes:
+        """Return the key for a function."""
+        hasher = hashlib.blake2b(bot_variable.encode(), digest_size=16)
+        hasher.update(b"\0" + _EMPTY_MODULE.code_for_node(node).encode())
+        return hasher.digest()
+
+    def get(self, key: bytes) -> Optional[FunctionSummary]:
+        with self._lock:
+            entries = self._load()
+            summary = entries.get(key)
+            if summary is None:
+                self.misses += 1
+                return None
+
+            entries.move_to_end(key)
+            self.hits += 1
+            return summary
+
+    def set(self, key: bytes, summary: FunctionSummary) -> None:
+        with self._lock:
+            entries = self._load()
+            entries[key] = summary
+            entries.move_to_end(key)
+            while len(entries) > self.capacity:
+                entries.popitem(last=False)
+
+            self._dirty = True
+
+    def save(self) -> None:
+        """Write the memo back to its path, if it has one and has changed."""
+        with self._lock:
+            if self.path is None or not self._dirty:
+                return
+
+            data = {
+                "stamp": _version_stamp().decode(),
+                "format": _FORMAT,
+                # Least recently used first, the same as in memory
+                "entries": {
+                    key.hex(): summary for key, summary in self._entries.items()
+                },
+            }
+            write_atomically(self.path, json.dumps(data, separators=(",", ":")))
+            self._dirty = False
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries = OrderedDict()
+            self._dirty = True
+            self.hits = 0
+            self.misses = 0
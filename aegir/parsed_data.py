@@ -1,17 +1,83 @@
-from typing import Union
+from typing import Optional, Union
 
-from aegir import FormatError
+from aegir.format_error import ErrorRecord, FormatError
 from aegir.bot_items import Listener, Command, Event
+from aegir.stats import Stats
+from aegir.util import ActionSummary, ActionType
 
 
 class ParsedData:
     def __init__(
         self,
         *,
-        commands: list[Command],
-        errors: list[FormatError],
-        events: list[Union[Event, Listener]],
+        commands: list[Union[Command, ActionSummary]],
+        errors: list[Union[FormatError, ErrorRecord]],
+        events: list[Union[Event, Listener, ActionSummary]],
+        stats: Optional[Stats] = None,
     ):
-        self.commands: list[Command] = commands
-        self.errors: list[FormatError] = errors
-        self.events: list[Union[Event, Listener]] = events
+        self.commands: list[Union[Command, ActionSummary]] = commands
+        self.errors: list[Union[FormatError, ErrorRecord]] = errors
+        self.events: list[Union[Event, Listener, ActionSummary]] = events
+        # Only present when stats were collected for the conversion
+        self.stats: Optional[Stats] = stats
+
+    def compact(self, file_path: Optional[str] = None) -> "ParsedData":
+        """Return a copy of this data which holds no cst.
+
+        Errors become :class:`ErrorRecord`'s and events
+        and commands become :class:`ActionSummary`'s.
+        """
+        return ParsedData(
+            commands=[
+                ActionSummary(name=command.name, action_type=ActionType.COMMAND)
+                for command in self.commands
+            ],
+            events=[
+                event
+                if isinstance(event, ActionSummary)
+                else ActionSummary(name=event.name, action_type=event.event_type)
+                for event in self.events
+            ],
+            errors=[
+                error if isinstance(error, ErrorRecord) else error.compact(file_path)
+                for error in self.errors
+            ],
+            stats=self.stats,
+        )
+
+    def serialize(self) -> dict:
+        """Return a json safe summary of this data."""
+        return {
+            "commands": [command.name for command in self.commands],
+            "events": [
+                {
+                    "name": event.name,
+                    "type": (
+                        event.action_type
+                        if isinstance(event, ActionSummary)
+                        else event.event_type
+                    ).name,
+                }
+                for event in self.events
+            ],
+            "errors": [error.serialize() for error in self.errors],
+        }
+
+    @classmethod
+    def deserialize(cls, data: dict) -> "ParsedData":
+        """Build data from the output of :meth:`serialize`.
+
+        Events and commands are restored as :class:`ActionSummary`'s
+        and errors will not have any cst attached.
+        """
+        return cls(
+            commands=[
+                ActionSummary(name=name, action_type=ActionType.COMMAND)
+                for name in data["commands"]
+            ],
+            events=[
+                ActionSummary(name=event["name"], action_type=ActionType[event["type"]])
+                for event in data["events"]
+            ],
+            errors=[FormatError.deserialize(error) for error in data["errors"]],
+        )
@@ -0,0 +1,237 @@
+from __future__ import annotations
+
+import logging
+import os
+import queue
+import threading
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import TYPE_CHECKING, Deque, Iterable, Iterator, Optional, Union
+
+from aegir.format_error import ErrorRecord
+from aegir.parsed_data import ParsedData
+
+if TYPE_CHECKING:
+    from aegir import Aegir
+    from aegir.aegir import PreparedFile
+
+log = logging.getLogger(__name__)
+
+# Marks the end of a stage's output
+_DONE = object()
+
+
+class _StageFailed:
+    def __init__(self, exception: BaseException):
+        self.exception: BaseException = exception
+
+
+class _ReadFile:
+    """A file which has been read and needs analysing, or was already cached."""
+
+    __slots__ = ("prepared", "cached")
+
+    def __init__(self, prepared: PreparedFile, cached: Optional[ParsedData] = None):
+        self.prepared: Optional[PreparedFile] = prepared
+        self.cached: Optional[ParsedData] = cached
+
+
+class StreamingPipeline:
+    """Stream errors for a project with memory bounded by the worker count.
+
+    Files flow through discover, read, parse and analyse, then emit
+    stages joined by bounded queues. Workers only send back cst free
+    records, so each file's tree is dropped as soon as it is analysed.
+
+    Parameters
+    ----------
+    aegir: Aegir
+        The project to stream errors for.
+    workers: int
+        How many processes to analyse with, 1 analyses within
+        this process and 0 uses one process per cpu.
+    queue_size: int
+        How many items may wait between any two stages.
+    """
+
+    def __init__(self, aegir: Aegir, *, workers: int = 1, queue_size: int = 16):
+        self._aegir: Aegir = aegir
+        self._workers: int = workers or os.cpu_count() or 1
+        self._queue_size: int = queue_size
+        self._stop: threading.Event = threading.Event()
+
+    def _put(self, target: queue.Queue, item) -> bool:
+        """Put into a bounded queue, giving up if the pipeline was stopped."""
+        while not self._stop.is_set():
+            try:
+                target.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+
+        return False
+
+    def _get(self, source: queue.Queue):
+        """Get from a queue, returning _DONE if the pipeline was stopped."""
+        while not self._stop.is_set():
+            try:
+                return source.get(timeout=0.1)
+            except queue.Empty:
+                continue
+
+        return _DONE
+
+    def _run_stage(self, func, *args) -> threading.Thread:
+        def runner():
+            output: queue.Queue = args[-1]
+            try:
+                func(*args)
+            except BaseException as e:
+                self._put(output, _StageFailed(e))
+            finally:
+                self._put(output, _DONE)
+
+        thread = threading.Thread(target=runner, daemon=True)
+        thread.start()
+        return thread
+
+    def _discover(self, output: queue.Queue) -> None:
+        self._put(output, self._aegir.main_file_path)
+        for file in self._aegir.discover_files():
+            if not self._put(output, file):
+                return
+
+    def _read(self, paths: queue.Queue, output: queue.Queue) -> None:
+        aegir = self._aegir
+        cache = aegir.cache
+        while True:
+            path = self._get(paths)
+            if path is _DONE:
+                return
+
+            if isinstance(path, _StageFailed):
+                self._put(output, path)
+                return
+
+            prepared = aegir.prepare_file(path)
+            if prepared is None:
+                continue
+
+            if prepared.skipped:
+                aegir.skipped_files.append(path)
+                continue
+
+            item = _ReadFile(prepared)
+            if cache is not None:
+                cached = cache.get(prepared.cache_key)
+                if cached is not None:
+                    item.cached = ParsedData.deserialize(cached).compact(
+                        prepared.display_path
+                    )
+                    item.prepared = None
+
+            if not self._put(output, item):
+                return
+
+    def _iter_read_files(self, read_files: queue.Queue) -> Iterator[_ReadFile]:
+        while True:
+            item = self._get(read_files)
+            if item is _DONE:
+                return
+
+            if isinstance(item, _StageFailed):
+                raise item.exception
+
+            yield item
+
+    def _analyse(
+        self, read_files: Iterable[_ReadFile], executor: Optional[ProcessPoolExecutor]
+    ) -> Iterator[ParsedData]:
+        from aegir.aegir import _convert_file
+
+        aegir = self._aegir
+        cache = aegir.cache
+        # Each entry is a file alongside either its cached data,
+        # the future converting it or the result of converting it
+        pending: Deque[tuple[_ReadFile, Union[Future, tuple, None]]] = deque()
+        max_pending = self._workers * 2
+
+        def finish(item: _ReadFile, result) -> Optional[ParsedData]:
+            if item.cached is not None:
+                return item.cached
+
+            if isinstance(result, Future):
+                result = result.result()
+
+            if result is None:
+                return None
+
+            parsed_data, serialized = result
+            if serialized is not None:
+                cache.set(item.prepared.cache_key, serialized)
+
+            return parsed_data
+
+        def is_ready(result) -> bool:
+            return not isinstance(result, Future) or result.done()
+
+        for item in read_files:
+            result = None
+            if item.cached is None:
+                args = aegir.conversion_args(
+                    item.prepared,
+                    workers=self._workers,
+                    serialize=cache is not None,
+                    compact=True,
+                )
+                if executor is None:
+                    result = _convert_file(*args)
+                else:
+                    result = executor.submit(_convert_file, *args)
+
+                # Source is no longer needed once handed off
+                item.prepared = item.prepared._replace(source=None)
+
+            pending.append((item, result))
+
+            # Emit in order, blocking once too much work is in flight
+            while pending and (len(pending) > max_pending or is_ready(pending[0][1])):
+                parsed_data = finish(*pending.popleft())
+                if parsed_data is not None:
+                    yield parsed_data
+
+        while pending:
+            parsed_data = finish(*pending.popleft())
+            if parsed_data is not None:
+                yield parsed_data
+
+    def __iter__(self) -> Iterator[ErrorRecord]:
+        paths: queue.Queue = queue.Queue(maxsize=self._queue_size)
+        read_files: queue.Queue = queue.Queue(maxsize=self._queue_size)
+        self._stop.clear()
+
+        executor: Optional[ProcessPoolExecutor] = None
+        if self._workers > 1:
+            executor = ProcessPoolExecutor(max_workers=self._workers)
+            # Workers are forked on first use, so do so before any stage threads exist
+            executor.submit(os.getpid).result()
+
+        threads = [
+            self._run_stage(self._discover, paths),
+            self._run_stage(self._read, paths, read_files),
+        ]
+        try:
+            for parsed_data in self._analyse(
+                self._iter_read_files(read_files), executor
+            ):
+                yield from parsed_data.errors
+
+            if self._aegir.memo is not None:
+                self._aegir.memo.save()
+        finally:
+            self._stop.set()
+            if executor is not None:
+                executor.shutdown(wait=True, cancel_futures=True)
+
+            for thread in threads:
+                thread.join(timeout=1)
@@ -0,0 +1,123 @@
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set
+
+import libcst
+from libcst.metadata import CodeRange, PositionProvider
+from libcst.metadata.position_provider import PositionProvidingCodegenState
+
+from aegir.format_error import FormatError
+
+
+@dataclass(frozen=False)
+class _TargetedPositionState(PositionProvidingCodegenState):
+    """Track positions while generating code, only recording the target nodes.
+
+    Generated tokens other then the last are discarded and positions are
+    only stored for the targets and every node within them, which their
+    ranges are built from.
+    """
+
+    targets: Set[int] = field(default_factory=set)
+    depth: int = 0
+
+    def add_indent_tokens(self) -> None:
+        for token in self.indent_tokens:
+            self.add_token(token)
+
+    def add_token(self, value: str) -> None:
+        # Only the last token is kept, which is all a Module's codegen looks at
+        self.tokens[-1:] = (value,)
+        self._update_position(value)
+
+    def _update_position(self, value: str) -> None:
+        if "\n" not in value and "\r" not in value:
+            self.column += len(value)
+        else:
+            super()._update_position(value)
+
+    def before_codegen(self, node: libcst.CSTNode) -> None:
+        if id(node) in self.targets:
+            self.depth += 1
+
+        if self.depth:
+            super().before_codegen(node)
+
+    def after_codegen(self, node: libcst.CSTNode) -> None:
+        if self.depth:
+            super().after_codegen(node)
+
+        if id(node) in self.targets:
+            self.depth -= 1
+
+    def record_syntactic_position(self, node: libcst.CSTNode, **kwargs):
+        if self.depth:
+            return super().record_syntactic_position(node, **kwargs)
+
+        return _NO_RECORD
+
+
+class _NoRecord:
+    __slots__ = ()
+
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+_NO_RECORD = _NoRecord()
+
+
+def compute_positions(
+    module: libcst.Module, nodes: Iterable[libcst.CSTNode]
+) -> Dict[libcst.CSTNode, CodeRange]:
+    """Return the position of each of the given nodes within module.
+
+    Nodes which are not part of module are left out.
+    """
+    nodes = list(nodes)
+    provider = PositionProvider()
+    state = _TargetedPositionState(
+        default_indent=module.default_indent,
+        default_newline=module.default_newline,
+        provider=provider,
+        targets={id(node) for node in nodes},
+    )
+    module._codegen(state)
+    return {
+        node: provider._computed[node] for node in nodes if node in provider._computed
+    }
+
+
+class LazyPositions:
+    """The positions of the nodes involved in a file's errors.
+
+    Nothing is computed until a position is first requested,
+    so files whose errors are never located cost nothing.
+    """
+
+    def __init__(self, module: libcst.Module, nodes: List[libcst.CSTNode]):
+        self._module: Optional[libcst.Module] = module
+        self._nodes: List[libcst.CSTNode] = nodes
+        self._positions: Optional[Dict[libcst.CSTNode, CodeRange]] = None
+
+    def position_for(self, node: libcst.CSTNode) -> Optional[CodeRange]:
+        if self._positions is None:
+            self._positions = compute_positions(self._module, self._nodes)
+            self._module = None
+            self._nodes = []
+
+        return self._positions.get(node)
+
+
+def attach_positions(module: libcst.Module, errors: List[FormatError]) -> None:
+    """Let each error lazily find its position within module."""
+    nodes = [error.old_cst for error in errors if error.old_cst is not None]
+    if not nodes:
+        return
+
+    positions = LazyPositions(module, nodes)
+    for error in errors:
+        if error.old_cst is not None:
+            error._positions = positions
@@ -0,0 +1,59 @@
+import functools
+import re
+from typing import Optional, Pattern, Tuple, Union
+
+from aegir.rules import BUILTIN_RULE_IDS, default_registry
+from aegir.util import BOT_CLASSES, DEFAULT_BOT_NAMES
+
+# The built in rules only produce a FormatError for decorators
+# on a bot instance, and only for events or listeners
+_DECORATOR = rb"@\s*\(?\s*%s\.(?:event|listen)\b"
+_ANY_DECORATOR = re.compile(_DECORATOR % rb"[\w.]*")
+# Other names are only bot instances when they're created or aliased in the file
+_BOT_CLASS = re.compile(
+    rb"\b(?:%s)\b" % b"|".join(name.encode() for name in sorted(BOT_CLASSES))
+)
+
+
+@functools.lru_cache(maxsize=32)
+def _patterns_for(bot_variable: Optional[str]) -> Tuple[Pattern[bytes], Pattern[bytes]]:
+    names = b"|".join(
+        re.escape(name.encode()) for name in (bot_variable, *DEFAULT_BOT_NAMES) if name
+    )
+    return (
+        re.compile(_DECORATOR % (b"(?:%s)[\\w.]*" % names)),
+        re.compile(rb"=\s*(?:%s)\b" % names),
+    )
+
+
+def might_need_migration(
+    source: Union[str, bytes], bot_variable: Optional[str] = None
+) -> bool:
+    """Cheaply check whether this source could produce any FormatError.
+
+    This is a bytes level search for event or listener decorators
+    on something which may be a bot instance, returning False means
+    a full parse can be skipped. False positives are fine, false
+    negatives are not.
+    """
+    if not default_registry.rule_ids <= BUILTIN_RULE_IDS:
+        # Other rules may apply to any file
+        return True
+
+    if isinstance(source, str):
+        source = source.encode()
+
+    if b"async" not in source:
+        return False
+
+    if not bot_variable:
+        # Any name is treated as the bot variable
+        return _ANY_DECORATOR.search(source) is not None
+
+    on_known_name, alias = _patterns_for(bot_variable)
+    if on_known_name.search(source) is not None:
+        return True
+
+    return _ANY_DECORATOR.search(source) is not None and (
+        _BOT_CLASS.search(source) is not None or alias.search(source) is not None
+    )
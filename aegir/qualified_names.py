@@ -0,0 +1,202 @@
+"""Resolve what the names within a file were imported as, using libcst's metadata.
+
+Each project file's module name is worked out once for the whole project
+using :class:`libcst.metadata.FullRepoManager`, so relative imports resolve
+to the module they actually refer to. This is all
+:class:`~libcst.metadata.FullyQualifiedNameProvider` needs from the
+rest of the project, and being small it is sent to workers alongside
+each file rather than being worked out again within them.
+
+Only a file's imports decide where its names come from, so names are
+resolved over the imports alone rather than the whole file. Files often
+share the same imports, so results are reused between them.
+"""
+import functools
+import logging
+from pathlib import Path
+from typing import AbstractSet, Dict, Iterable, List, Optional, Sequence, Set, Union
+
+import libcst
+from libcst.helpers import get_full_name_for_node
+from libcst.helpers.module import ModuleNameAndPackage
+from libcst.metadata import (
+    FullRepoManager,
+    FullyQualifiedNameProvider,
+    MetadataWrapper,
+    QualifiedNameSource,
+)
+
+from aegir.util import CHECK_MODULES, Import, ImportFrom
+
+log = logging.getLogger(__name__)
+
+# Where decorators Aegir knows about are defined, mapped to the name they are classified by
+NEXTCORD_MODULES: Dict[str, str] = {
+    f"nextcord.ext.{module}": module for module in sorted(CHECK_MODULES)
+}
+_EMPTY_MODULE = libcst.Module([])
+
+
+class ModuleNames:
+    """The module name and package of every project file.
+
+    Parameters
+    ----------
+    roots: Iterable[Path]
+        The directories modules are imported relative to,
+        I.e. the directory the bot is run from.
+    """
+
+    def __init__(self, roots: Iterable[Path]):
+        self.roots: List[Path] = list(roots)
+        # Names only depend on a file's path, so are never invalidated
+        self._modules: Dict[Path, ModuleNameAndPackage] = {}
+
+    def update(self, files: Iterable[Path]) -> None:
+        """Work out the module name of any of these files not already known."""
+        missing: Dict[Path, List[str]] = {}
+        for file in files:
+            if file in self._modules:
+                continue
+
+            root = self._root_for(file)
+            missing.setdefault(root, []).append(str(file))
+
+        for root, paths in missing.items():
+            manager = FullRepoManager(root, paths, {FullyQualifiedNameProvider})
+            for path, module in manager.cache[FullyQualifiedNameProvider].items():
+                self._modules[Path(path)] = module
+
+    def _root_for(self, file: Path) -> Path:
+        for root in self.roots:
+            if root in file.parents:
+                return root
+
+        # Outside of the project, so treat it as a top level module
+        return file.parent
+
+    def module_for(self, file: Path) -> ModuleNameAndPackage:
+        """Return the module name and package of a file."""
+        if file not in self._modules:
+            self.update([file])
+
+        return self._modules[file]
+
+
+def import_origins(
+    imports: Sequence[Union[Import, ImportFrom]], module: ModuleNameAndPackage
+) -> Dict[str, str]:
+    """Return the fully qualified name each name bound by these imports refers to.
+
+    The returned dict is shared with other callers, so must not be modified.
+
+    Parameters
+    ----------
+    imports: Sequence[Union[Import, ImportFrom]]
+        Every import within a file.
+    module: ModuleNameAndPackage
+        The module name and package of the file, see :class:`ModuleNames`.
+    """
+    if not imports:
+        return {}
+
+    code = "\n".join(_EMPTY_MODULE.code_for_node(item.cst) for item in imports)
+    # Only imported names are kept, which only depend on the package
+    return _origins_for(code, module.package)
+
+
+@functools.lru_cache(maxsize=256)
+def _origins_for(code: str, package: str) -> Dict[str, str]:
+    imports = libcst.parse_module(code)
+    # Each bound name is looked up as it would be used within the file
+    lines: List[libcst.SimpleStatementLine] = []
+    for line in imports.body:
+        statement = line.body[0]
+        if isinstance(statement.names, libcst.ImportStar):
+            continue
+
+        for alias in statement.names:
+            if alias.asname is not None:
+                bound = alias.asname.name.value
+            elif isinstance(statement, libcst.Import):
+                # I.e. import nextcord.ext.commands binds nextcord
+                bound = get_full_name_for_node(alias.name).split(".")[0]
+            else:
+                bound = alias.name.value
+
+            lines.append(libcst.SimpleStatementLine([libcst.Expr(libcst.Name(bound))]))
+
+    wrapper = MetadataWrapper(
+        imports.with_changes(body=(*imports.body, *lines)),
+        unsafe_skip_copy=True,
+        cache={FullyQualifiedNameProvider: ModuleNameAndPackage(package, package)},
+    )
+    try:
+        names = wrapper.resolve(FullyQualifiedNameProvider)
+    except ImportError as e:
+        # I.e. a relative import beyond the top level package
+        log.debug("Couldn't resolve imports within package '%s': %s", package, e)
+        return {}
+
+    origins: Dict[str, str] = {}
+    for line in lines:
+        node = line.body[0].value
+        qualified_names = [
+            qualified_name.name
+            for qualified_name in names.get(node, ())
+            if qualified_name.source == QualifiedNameSource.IMPORT
+        ]
+        # Names imported more then once may refer to either
+        if len(qualified_names) == 1:
+            origins[node.value] = qualified_names[0]
+
+    return origins
+
+
+def qualify(name: str, origins: Dict[str, str]) -> str:
+    """Return a resolved name in terms of where it was imported from.
+
+    Names from nextcord are given as they are classified, I.e.
+    ``c.has_role`` is ``commands.has_role`` given
+    ``from nextcord.ext import commands as c``. Names imported from
+    anywhere else are given in full, so ``commands.check`` is
+    ``mylib.commands.check`` given ``from mylib import commands``.
+
+    Parameters
+    ----------
+    name: str
+        A resolved name, see :func:`aegir.util.resolve_name`.
+    origins: Dict[str, str]
+        The file's imports, see :func:`import_origins`.
+    """
+    root, separator, rest = name.partition(".")
+    origin: Optional[str] = origins.get(root)
+    if origin is None:
+        return name
+
+    qualified = f"{origin}{separator}{rest}"
+    for module, classified_as in NEXTCORD_MODULES.items():
+        if qualified == module or qualified.startswith(f"{module}."):
+            return classified_as + qualified[len(module) :]
+
+    return qualified
+
+
+def imported_instances(
+    origins: Dict[str, str], instances: AbstractSet[str]
+) -> Set[str]:
+    """Return the fully qualified name of each imported bot instance.
+
+    These are names whose own name is a bot instance within the file,
+    I.e. ``main.bot`` given ``from main import bot as b``.
+
+    Parameters
+    ----------
+    origins: Dict[str, str]
+        The file's imports, see :func:`import_origins`.
+    instances: AbstractSet[str]
+        The bot instances found within the file.
+    """
+    return {
+        origin for origin in origins.values() if origin.rpartition(".")[2] in instances
+    }
@@ -0,0 +1,321 @@
+"""Migration rules and the registry dispatching nodes to them.
+
+Each rule declares the libcst node types it checks. The analyzer asks the
+registry which rules apply to each node as it traverses a file, so files
+are still only walked once however many rules are registered.
+
+Rules are added to :data:`default_registry`, which every analysis uses::
+
+    class IntentsRule(Rule):
+        rule_id = "intents"
+        node_types = (libcst.Call,)
+
+        def check(self, node, context):
+            ...
+
+    default_registry.register(IntentsRule())
+"""
+from __future__ import annotations
+
+import logging
+from abc import ABC, abstractmethod
+from typing import (
+    TYPE_CHECKING,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+)
+
+import libcst
+
+from aegir.format_error import FormatError
+from aegir.util import ActionType, DecoratorType
+
+if TYPE_CHECKING:
+    from aegir.bot_items import Command, Decorator, Event, Listener
+
+log = logging.getLogger(__name__)
+
+Action = Union["Command", "Event", "Listener"]
+
+
+class RuleContext:
+    """What a rule knows about the node it is checking.
+
+    Parameters
+    ----------
+    action: Optional[Union[Command, Event, Listener]]
+        The event, listener or command the node is within, if any.
+    bot_variable: str
+        The name of the bot variable.
+    """
+
+    __slots__ = ("action", "action_type", "bot_variable", "_decorators")
+
+    def __init__(self, action: Optional[Action], *, bot_variable: str):
+        from aegir.bot_items import Command
+
+        self.action: Optional[Action] = action
+        self.action_type: Optional[ActionType] = None
+        self.bot_variable: str = bot_variable
+        self._decorators: Dict[int, Decorator] = {}
+        if isinstance(action, Command):
+            self.action_type = ActionType.COMMAND
+
+        elif action is not None:
+            self.action_type = action.event_type
+            self._decorators = {id(decor.cst): decor for decor in action.decorators}
+
+    def decorator_for(self, node: libcst.Decorator) -> Optional[Decorator]:
+        """Return how a decorator on the action was classified, if it was."""
+        return self._decorators.get(id(node))
+
+
+class Rule(ABC):
+    """A single migration rule.
+
+    Subclasses set ``rule_id`` and ``node_types`` and implement :meth:`check`,
+    which is then only called for nodes of those types. Nodes are checked
+    once they have been left, so children are checked before parents.
+    """
+
+    rule_id: str = "unknown"
+    node_types: Tuple[Type[libcst.CSTNode], ...] = ()
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(rule_id='{self.rule_id}')"
+
+    @abstractmethod
+    def check(self, node: libcst.CSTNode, context: RuleContext) -> List[FormatError]:
+        """Return the errors within a node, see :class:`RuleContext`."""
+
+
+class _DispatchTable(dict):
+    """Maps a node's type to the rules checking it, filled in as types are seen."""
+
+    def __init__(self, rules: Iterable[Rule]):
+        super().__init__()
+        self._rules: Tuple[Rule, ...] = tuple(rules)
+
+    def __missing__(self, node_type: Type[libcst.CSTNode]) -> Tuple[Rule, ...]:
+        rules = tuple(
+            rule for rule in self._rules if issubclass(node_type, rule.node_types)
+        )
+        self[node_type] = rules
+        return rules
+
+
+class RuleRegistry:
+    """A collection of rules, alongside the table dispatching nodes to them.
+
+    Parameters
+    ----------
+    rules: Iterable[Rule]
+        The rules to start with.
+    """
+
+    def __init__(self, rules: Iterable[Rule] = ()):
+        self._rules: Dict[str, Rule] = {}
+        self._dispatch: Optional[_DispatchTable] = None
+        for rule in rules:
+            self.register(rule)
+
+    def __repr__(self):
+        return f"RuleRegistry(rules={list(self._rules)})"
+
+    def __len__(self):
+        return len(self._rules)
+
+    @property
+    def rules(self) -> List[Rule]:
+        return list(self._rules.values())
+
+    @property
+    def rule_ids(self) -> FrozenSet[str]:
+        return frozenset(self._rules)
+
+    @property
+    def node_types(self) -> FrozenSet[Type[libcst.CSTNode]]:
+        """Every node type a rule checks."""
+        return frozenset(
+            node_type for rule in self._rules.values() for node_type in rule.node_types
+        )
+
+    def register(self, rule: Rule) -> Rule:
+        """Add a rule, returning it.
+
+        Raises
+        ------
+        ValueError
+            A rule with the same id is already registered.
+        """
+        if rule.rule_id in self._rules:
+            raise ValueError(f"A rule with the id '{rule.rule_id}' already exists")
+
+        self._rules[rule.rule_id] = rule
+        self._dispatch = None
+        return rule
+
+    def unregister(self, rule_id: str) -> Optional[Rule]:
+        """Remove a rule, returning it if it was registered."""
+        self._dispatch = None
+        return self._rules.pop(rule_id, None)
+
+    def dispatch_table(self) -> Dict[Type[libcst.CSTNode], Tuple[Rule, ...]]:
+        """Return the table mapping node types to the rules checking them.
+
+        This is built once and reused till the registered rules change.
+        """
+        if self._dispatch is None:
+            self._dispatch = _DispatchTable(self._rules.values())
+
+        return self._dispatch
+
+    def errors_for(
+        self, action: Union[Event, Listener], *, bot_variable: str = ""
+    ) -> List[FormatError]:
+        """Check a single event or listener outside of a file's analysis."""
+        collector = _NodeCollector(self.dispatch_table())
+        action.cst.visit(collector)
+        context = RuleContext(action, bot_variable=bot_variable)
+        errors: List[FormatError] = []
+        for node, rules in collector.nodes:
+            for rule in rules:
+                errors.extend(rule.check(node, context))
+
+        return errors
+
+
+class _NodeCollector(libcst.CSTVisitor):
+    def __init__(self, dispatch: Dict[Type[libcst.CSTNode], Tuple[Rule, ...]]):
+        self._dispatch: Dict[Type[libcst.CSTNode], Tuple[Rule, ...]] = dispatch
+        self.nodes: List[Tuple[libcst.CSTNode, Tuple[Rule, ...]]] = []
+
+    def on_leave(self, original_node: libcst.CSTNode) -> None:
+        rules = self._dispatch[type(original_node)]
+        if rules:
+            self.nodes.append((original_node, rules))
+
+
+class EventCalledRule(Rule):
+    rule_id = "event-called"
+    node_types = (libcst.Decorator,)
+
+    def check(self, node: libcst.Decorator, context: RuleContext) -> List[FormatError]:
+        decor = context.decorator_for(node)
+        if (
+            context.action_type not in (ActionType.EVENT, ActionType.LISTENER)
+            or decor is None
+            or decor.decor_type != DecoratorType.EVENT
+            or not decor.was_called
+        ):
+            return []
+
+        return [
+            FormatError(
+                rule_id=self.rule_id,
+                title="Event's do not need to be called.",
+                description="When defining an event on your bot variable you do not need to use brackets.",
+                old_cst=node,
+                # libcst nodes are immutable, so fixes are built with
+                # with_changes rather then copying the original nodes
+                fixed_cst=node.with_changes(decorator=node.decorator.func),
+            )
+        ]
+
+
+class ListenerNotCalledRule(Rule):
+    rule_id = "listener-not-called"
+    node_types = (libcst.Decorator,)
+
+    def check(self, node: libcst.Decorator, context: RuleContext) -> List[FormatError]:
+        decor = context.decorator_for(node)
+        if (
+            context.action_type not in (ActionType.EVENT, ActionType.LISTENER)
+            or decor is None
+            or decor.decor_type != DecoratorType.LISTENER
+            or decor.was_called
+        ):
+            return []
+
+        return [
+            FormatError(
+                rule_id=self.rule_id,
+                title="Listener's must be called.",
+                description="When defining a listener on your bot variable you do need to use brackets.",
+                old_cst=node,
+                fixed_cst=node.with_changes(decorator=libcst.Call(func=node.decorator)),
+            )
+        ]
+
+
+class OnMessageWithoutProcessCommandsRule(Rule):
+    rule_id = "on-message-without-process-commands"
+    node_types = (libcst.FunctionDef,)
+
+    def check(
+        self, node: libcst.FunctionDef, context: RuleContext
+    ) -> List[FormatError]:
+        event = context.action
+        if (
+            context.action_type != ActionType.EVENT
+            or event.cst is not node
+            or event.name != "on_message"
+            or event.does_function_processes_commands
+        ):
+            return []
+
+        args = event._get_named_arguments()
+        fix = libcst.SimpleStatementLine(
+            [
+                libcst.Expr(
+                    libcst.Await(
+                        libcst.Call(
+                            libcst.Attribute(
+                                libcst.Name(event._guess_bot_variable()),
+                                libcst.Name("process_commands"),
+                            ),
+                            args=[
+                                libcst.Arg(
+                                    libcst.Name(args[1] if event.is_in_cog else args[0])
+                                )
+                            ],
+                        )
+                    )
+                )
+            ]
+        )
+        body = node.body.with_changes(body=(*node.body.body, fix))
+        return [
+            FormatError(
+                rule_id=self.rule_id,
+                title="Overriding on_message without process_commands.",
+                description="Looks like you override the on_message event "
+                "without processing commands.\n This means your commands "
+                "will not get called at all, you should change your event to the below.\n\n"
+                "Note: This may not be in the right place so double check it is.\n\n"
+                f"You can read more about it at https://docs.disnake.dev/en/latest/faq.html"
+                "?highlight=frequently#why-does-on-message-make-my-commands-stop-working",
+                old_cst=node,
+                fixed_cst=node.with_changes(body=body),
+            )
+        ]
+
+
+# The rules the fast tier and pre-filter know how to look for
+BUILTIN_RULE_IDS: FrozenSet[str] = frozenset(
+    {
+        EventCalledRule.rule_id,
+        ListenerNotCalledRule.rule_id,
+        OnMessageWithoutProcessCommandsRule.rule_id,
+    }
+)
+
+default_registry: RuleRegistry = RuleRegistry(
+    [EventCalledRule(), ListenerNotCalledRule(), OnMessageWithoutProcessCommandsRule()]
+)
@@ -0,0 +1,129 @@
+import logging
+import time
+from typing import Callable, Dict, NamedTuple, Optional
+
+log = logging.getLogger(__name__)
+
+
+class PhaseTiming(NamedTuple):
+    wall: float
+    cpu: float
+    calls: int
+
+
+class _Phase:
+    __slots__ = ("_stats", "_name", "_wall", "_cpu")
+
+    def __init__(self, stats: "Stats", name: str):
+        self._stats: Stats = stats
+        self._name: str = name
+
+    def __enter__(self):
+        self._wall = time.perf_counter()
+        self._cpu = time.process_time()
+
+    def __exit__(self, *exc_info):
+        self._stats.add_timing(
+            self._name,
+            time.perf_counter() - self._wall,
+            time.process_time() - self._cpu,
+        )
+
+
+class _NullPhase:
+    __slots__ = ()
+
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+_NULL_PHASE = _NullPhase()
+
+
+class Stats:
+    """Timings and counters collected during a conversion.
+
+    Phases may nest, in which case the outer phase
+    also includes the time spent within the inner phase.
+    ``run_mode`` and ``decorators`` are both
+    included within ``analysis`` for example.
+    """
+
+    enabled: bool = True
+
+    def __init__(self, label: Optional[str] = None):
+        self.label: Optional[str] = label
+        self.timings: Dict[str, PhaseTiming] = {}
+        self.counters: Dict[str, int] = {}
+
+    def __repr__(self):
+        return f"Stats(label={self.label!r}, counters={self.counters})"
+
+    def phase(self, name: str):
+        """Return a context manager timing the code within it."""
+        return _Phase(self, name)
+
+    def add_timing(self, name: str, wall: float, cpu: float, calls: int = 1) -> None:
+        current = self.timings.get(name)
+        if current is not None:
+            wall += current.wall
+            cpu += current.cpu
+            calls += current.calls
+
+        self.timings[name] = PhaseTiming(wall, cpu, calls)
+
+    def increment(self, name: str, amount: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def merge(self, other: Optional["Stats"]) -> None:
+        """Add the timings and counters from other into these stats."""
+        if other is None or not other.enabled:
+            return
+
+        for name, timing in other.timings.items():
+            self.add_timing(name, *timing)
+
+        for name, amount in other.counters.items():
+            self.increment(name, amount)
+
+    def as_dict(self) -> dict:
+        return {
+            "label": self.label,
+            "timings": {
+                name: timing._asdict() for name, timing in self.timings.items()
+            },
+            "counters": dict(self.counters),
+        }
+
+
+class _NullStats(Stats):
+    """Used when stats are disabled so instrumentation costs next to nothing."""
+
+    enabled: bool = False
+
+    def phase(self, name: str):
+        return _NULL_PHASE
+
+    def add_timing(self, name: str, wall: float, cpu: float, calls: int = 1) -> None:
+        pass
+
+    def increment(self, name: str, amount: int = 1) -> None:
+        pass
+
+
+NULL_STATS: Stats = _NullStats()
+
+StatsHook = Callable[[Stats], None]
+
+
+def log_stats(stats: Stats) -> None:
+    """A stats hook which logs the given stats at debug level."""
+    timings = ", ".join(
+        f"{name}={timing.wall:.4f}s" for name, timing in stats.timings.items()
+    )
+    log.debug(
+        "Stats for %s: %s | %s", stats.label or "conversion", timings, stats.counters
+    )
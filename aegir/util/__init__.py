@@ -1,4 +1,17 @@
 from .run_mode import RunMode
 from .import_util import Import, ImportFrom, ImportEntry
-from .decorator_util import DecoratorType
-from .action_type import EventParam, ActionType
+from .decorator_util import (
+    CHECK_MODULES,
+    DECORATOR_ACTION_TYPES,
+    DecoratorTable,
+    DecoratorType,
+)
+from .bot_util import (
+    BOT_CLASSES,
+    DEFAULT_BOT_NAMES,
+    BotAssignment,
+    find_bot_instances,
+    run_calls_for,
+)
+from .action_type import EventParam, ActionType, ActionSummary
+from .name_util import NameResolver, resolve_name
@@ -15,3 +15,10 @@ class ActionType(Enum):
     LISTENER = 2
     UNKNOWN = 3
     COMMAND = 4
+
+
+class ActionSummary(NamedTuple):
+    """A cst free record of an event, listener or command."""
+
+    name: str
+    action_type: ActionType
@@ -0,0 +1,82 @@
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+)
+
+# Classes whose instances are bots, subclasses are found per file
+BOT_CLASSES: FrozenSet[str] = frozenset(
+    {"Bot", "Client", "AutoShardedBot", "AutoShardedClient"}
+)
+# Always treated as bot instances, so snippets and cogs still work
+DEFAULT_BOT_NAMES = ("bot", "client")
+
+
+class BotAssignment(NamedTuple):
+    """An assignment which may create a bot instance."""
+
+    # The node assigned to
+    target: Any
+    # The last name of what was called, I.e. Bot for commands.Bot()
+    called: Optional[str]
+    # The name assigned from, I.e. bot for self.bot = bot
+    alias: Optional[str]
+
+
+def find_bot_instances(
+    bot_variable: str,
+    classes: Iterable[tuple[str, List[str]]],
+    assignments: Iterable[BotAssignment],
+    resolve: Callable[[Any], str],
+    known: Iterable[str] = (),
+) -> Set[str]:
+    """Return the name of every bot instance within a file.
+
+    Parameters
+    ----------
+    bot_variable: str
+        The name of the bot variable.
+    classes: Iterable[tuple[str, List[str]]]
+        Each class defined alongside the last name of each of its bases.
+    assignments: Iterable[BotAssignment]
+        Each assignment, in the order they were found.
+    resolve: Callable[[Any], str]
+        Returns the dotted name of an assignment's target.
+    known: Iterable[str]
+        Bot instances found elsewhere, I.e. in another part of the document.
+    """
+    bases: Dict[str, List[str]] = {}
+    for name, class_bases in classes:
+        bases.setdefault(name, []).extend(class_bases)
+
+    bot_classes: Set[str] = set(BOT_CLASSES)
+    found = True
+    while found:
+        # Repeated so subclasses of subclasses are found
+        found = False
+        for name, class_bases in bases.items():
+            if name not in bot_classes and not bot_classes.isdisjoint(class_bases):
+                bot_classes.add(name)
+                found = True
+
+    instances: Set[str] = {
+        name for name in (bot_variable, *DEFAULT_BOT_NAMES, *known) if name
+    }
+    for assignment in assignments:
+        if assignment.called in bot_classes or assignment.alias in instances:
+            instances.add(resolve(assignment.target))
+
+    return instances
+
+
+def run_calls_for(instances: Iterable[str]) -> FrozenSet[str]:
+    """Return the calls which start each bot instance."""
+    return frozenset(
+        f"{instance}.{method}" for instance in instances for method in ("run", "start")
+    )
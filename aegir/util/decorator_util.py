@@ -1,4 +1,7 @@
 from enum import Enum
+from typing import Dict, Iterable, Optional
+
+from .action_type import ActionType
 
 
 class DecoratorType(Enum):
@@ -7,3 +10,79 @@ class DecoratorType(Enum):
     CHECK = 3
     UNKNOWN = 4
     COMMAND = 5
+
+
+# The action a function becomes when it has a decorator of this type
+DECORATOR_ACTION_TYPES: Dict[DecoratorType, ActionType] = {
+    DecoratorType.EVENT: ActionType.EVENT,
+    DecoratorType.COMMAND: ActionType.COMMAND,
+    DecoratorType.LISTENER: ActionType.LISTENER,
+}
+# Decorators on a bot instance, keyed by the attribute used
+BOT_DECORATORS: Dict[str, DecoratorType] = {
+    "event": DecoratorType.EVENT,
+    "command": DecoratorType.COMMAND,
+    "listen": DecoratorType.LISTENER,
+}
+CHECK_MODULES = frozenset({"commands", "application_checks"})
+
+
+class DecoratorTable:
+    """Classifies decorators by their resolved name using a single dict lookup.
+
+    Names on each bot instance are added up front, anything else is
+    worked out on first sight and stored alongside them.
+
+    Parameters
+    ----------
+    instances: Iterable[str]
+        The names of every bot instance, I.e. ``bot`` or ``self.bot``.
+    any_instance: bool
+        If True, any name is treated as a bot instance.
+    """
+
+    __slots__ = ("instances", "any_instance", "_types")
+
+    def __init__(self, instances: Iterable[str], *, any_instance: bool = False):
+        self.instances: frozenset = frozenset(instances)
+        self.any_instance: bool = any_instance
+        self._types: Dict[str, Optional[DecoratorType]] = {
+            f"{instance}.{attribute}": decor_type
+            for instance in self.instances
+            for attribute, decor_type in BOT_DECORATORS.items()
+        }
+
+    def classify(self, decor_name: str) -> Optional[DecoratorType]:
+        """Return the type of decorator given its resolved name.
+
+        Returns None for decorators on a bot instance which Aegir does not track.
+        """
+        try:
+            return self._types[decor_name]
+        except KeyError:
+            decor_type = self._types[decor_name] = self._classify(decor_name)
+            return decor_type
+
+    def _classify(self, decor_name: str) -> Optional[DecoratorType]:
+        owner, _, attribute = decor_name.rpartition(".")
+        if self.any_instance:
+            return BOT_DECORATORS.get(attribute) if owner else None
+
+        if self._is_instance(owner):
+            # I.e. bot.tree.command
+            return BOT_DECORATORS.get(attribute)
+
+        # Checks
+        if owner and decor_name.partition(".")[0] in CHECK_MODULES:
+            return DecoratorType.CHECK
+
+        return DecoratorType.UNKNOWN
+
+    def _is_instance(self, name: str) -> bool:
+        while name:
+            if name in self.instances:
+                return True
+
+            name = name.rpartition(".")[0]
+
+        return False
@@ -0,0 +1,74 @@
+import sys
+from typing import Dict, List, Tuple
+
+import libcst
+
+
+def resolve_name(node: libcst.BaseExpression) -> str:
+    """Return the dotted name of a name, attribute or call, I.e. nextcord.ext.commands.
+
+    Calls resolve to what is called, and the chain stops at
+    anything which isn't a name or attribute. This walks the
+    chain in a loop, so deeply chained attributes cost O(depth).
+
+    Raises
+    ------
+    AttributeError
+        The node, or what it calls, is not a name, attribute or call.
+    """
+    parts: List[str] = []
+    current = node
+    while True:
+        if isinstance(current, libcst.Call):
+            current = current.func
+
+        elif isinstance(current, libcst.Name):
+            parts.append(current.value)
+            break
+
+        elif isinstance(current, libcst.Attribute):
+            parts.append(current.attr.value)
+            value = current.value
+            if isinstance(value, libcst.Attribute):
+                current = value
+                continue
+
+            if isinstance(value, libcst.Name):
+                parts.append(value.value)
+
+            # Otherwise the base isn't named, I.e. get_bot().event
+            break
+
+        else:
+            raise AttributeError(
+                f"Can't resolve the name of a {type(current).__name__} node"
+            )
+
+    parts.reverse()
+    return sys.intern(".".join(parts))
+
+
+class NameResolver:
+    """Resolves dotted names, remembering each node's name.
+
+    Nodes are remembered by identity, so a resolver should
+    only be used for as long as the tree it resolves.
+    """
+
+    __slots__ = ("_names",)
+
+    def __init__(self):
+        # Nodes are kept alongside their names so ids are never reused
+        self._names: Dict[int, Tuple[libcst.BaseExpression, str]] = {}
+
+    def __len__(self):
+        return len(self._names)
+
+    def resolve(self, node: libcst.BaseExpression) -> str:
+        """See :func:`resolve_name`."""
+        try:
+            return self._names[id(node)][1]
+        except KeyError:
+            name = resolve_name(node)
+            self._names[id(node)] = (node, name)
+            return name
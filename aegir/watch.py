@@ -0,0 +1,182 @@
+"""Re-analyse a project's files as they are modified."""
+from __future__ import annotations
+
+import logging
+import time
+from collections import Counter
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from aegir.format_error import ErrorRecord
+from aegir.parsed_data import ParsedData
+
+if TYPE_CHECKING:
+    from aegir import Aegir
+
+log = logging.getLogger(__name__)
+
+# A file's modification time and size
+_FileStamp = Tuple[int, int]
+
+
+class ErrorDelta(NamedTuple):
+    """How a file's errors changed since it was last analysed."""
+
+    file_path: str
+    added: List[ErrorRecord]
+    removed: List[ErrorRecord]
+
+
+def _error_key(record: ErrorRecord) -> tuple:
+    # Positions are left out so edits elsewhere in a file don't count
+    return record.rule_id, record.title, record.replacement
+
+
+def _diff_records(
+    file_path: str, old: List[ErrorRecord], new: List[ErrorRecord]
+) -> Optional[ErrorDelta]:
+    remaining = Counter(_error_key(record) for record in old)
+    added: List[ErrorRecord] = []
+    for record in new:
+        key = _error_key(record)
+        if remaining[key]:
+            remaining[key] -= 1
+        else:
+            added.append(record)
+
+    removed: List[ErrorRecord] = []
+    for record in old:
+        key = _error_key(record)
+        if remaining[key]:
+            remaining[key] -= 1
+            removed.append(record)
+
+    if not added and not removed:
+        return None
+
+    return ErrorDelta(file_path=file_path, added=added, removed=removed)
+
+
+class Watcher:
+    """Keep a project analysed, re-analysing only the files which change.
+
+    Every file's results are kept in memory and modification
+    times are polled, once changes settle only the modified
+    files are analysed again.
+
+    Parameters
+    ----------
+    aegir: Aegir
+        The project to watch.
+    interval: float
+        How many seconds to wait between checking for changes.
+    debounce: float
+        How many seconds files must go unmodified before
+        being analysed, so a burst of saves is analysed once.
+    """
+
+    def __init__(self, aegir: Aegir, *, interval: float = 0.5, debounce: float = 0.2):
+        self._aegir: Aegir = aegir
+        self.interval: float = interval
+        self.debounce: float = debounce
+        self._stamps: Dict[Path, _FileStamp] = {}
+        self.results: Dict[Path, Optional[ParsedData]] = {}
+        self._records: Dict[Path, List[ErrorRecord]] = {}
+
+    @property
+    def errors(self) -> List[ErrorRecord]:
+        """Every error currently within the project."""
+        errors: List[ErrorRecord] = []
+        for file in self._stamps:
+            errors.extend(self._records.get(file, ()))
+
+        return errors
+
+    def _snapshot(self) -> Dict[Path, _FileStamp]:
+        stamps: Dict[Path, _FileStamp] = {}
+        for file in (self._aegir.main_file_path, *self._aegir.discover_files()):
+            try:
+                stat = file.stat()
+            except FileNotFoundError:
+                continue
+
+            stamps[file] = (stat.st_mtime_ns, stat.st_size)
+
+        return stamps
+
+    def _analyse(self, file: Path) -> Optional[ParsedData]:
+        from aegir.aegir import _convert_file
+
+        prepared = self._aegir.prepare_file(file)
+        if prepared is None or prepared.skipped:
+            return None
+
+        result = _convert_file(*self._aegir.conversion_args(prepared))
+        return None if result is None else result[0]
+
+    def _update(self, files: List[Path]) -> List[ErrorDelta]:
+        deltas: List[ErrorDelta] = []
+        for file in files:
+            display_path = self._aegir.display_path(file)
+            if file in self._stamps:
+                parsed_data = self._analyse(file)
+                self.results[file] = parsed_data
+                records = (
+                    []
+                    if parsed_data is None
+                    else parsed_data.compact(display_path).errors
+                )
+            else:
+                self.results.pop(file, None)
+                records = []
+
+            delta = _diff_records(display_path, self._records.pop(file, []), records)
+            if records:
+                self._records[file] = records
+
+            if delta is not None:
+                deltas.append(delta)
+
+        if self._aegir.memo is not None:
+            self._aegir.memo.save()
+
+        return deltas
+
+    def start(self) -> List[ErrorDelta]:
+        """Analyse every file, returning each file's errors as added."""
+        self._stamps = self._snapshot()
+        self.results = {}
+        self._records = {}
+        return self._update(list(self._stamps))
+
+    def poll(self) -> List[ErrorDelta]:
+        """Check for modified files once, re-analysing any which changed."""
+        stamps = self._snapshot()
+        if stamps == self._stamps:
+            return []
+
+        # Wait for changes to settle, I.e. editors saving many files at once
+        while True:
+            time.sleep(self.debounce)
+            settled = self._snapshot()
+            if settled == stamps:
+                break
+
+            stamps = settled
+
+        changed = [
+            file
+            for file in stamps.keys() | self._stamps.keys()
+            if stamps.get(file) != self._stamps.get(file)
+        ]
+        self._stamps = stamps
+        changed.sort()
+        log.debug("Re-analysing %s modified files", len(changed))
+        return self._update(changed)
+
+    def __iter__(self) -> Iterator[ErrorDelta]:
+        """Yield deltas forever, starting with every error in the project."""
+        yield from self.start()
+        while True:
+            yield from self.poll()
+            time.sleep(self.interval)
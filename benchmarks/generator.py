@@ -0,0 +1,198 @@
+"""Generate synthetic nextcord bot projects for benchmarking."""
+import random
+from pathlib import Path
+from typing import List, Literal, NamedTuple, Optional
+
+EntryPoint = Literal["bot_run", "asyncio_run"]
+
+_EVENT_NAMES = (
+    "on_ready",
+    "on_message_edit",
+    "on_member_join",
+    "on_member_remove",
+    "on_guild_join",
+    "on_reaction_add",
+    "on_command_error",
+)
+
+
+class ProjectConfig(NamedTuple):
+    events: int = 10
+    listeners: int = 10
+    commands: int = 10
+    cogs: int = 0
+    # How many of each handler every cog defines
+    cog_handlers: int = 5
+    # Files with nothing to migrate, I.e. models or utils
+    plain_files: int = 0
+    entry_point: EntryPoint = "bot_run"
+    nesting_depth: int = 2
+    # The chance any given item contains an error
+    error_density: float = 0.1
+    seed: int = 0
+
+
+def _nested_body(rng: random.Random, depth: int, indent: str) -> List[str]:
+    lines: List[str] = []
+    for level in range(depth):
+        lines.append(
+            f"{indent}if {rng.choice(('ctx', 'message', 'data'))}.value_{level}:"
+        )
+        indent += "    "
+        lines.append(f"{indent}result = await fetch_{level}({level}, key='x')")
+
+    lines.append(f"{indent}log.info('done %s', {depth})")
+    return lines
+
+
+def _handler(
+    rng: random.Random,
+    *,
+    kind: str,
+    name: str,
+    bot: str,
+    depth: int,
+    error_density: float,
+    indent: str = "",
+) -> List[str]:
+    has_error = rng.random() < error_density
+    if kind == "event":
+        decorator = f"@{bot}.event()" if has_error else f"@{bot}.event"
+        params = "*args"
+    elif kind == "listener":
+        decorator = f"@{bot}.listen" if has_error else f"@{bot}.listen()"
+        params = "*args"
+    elif kind == "on_message":
+        decorator = f"@{bot}.event"
+        params = "message"
+    else:
+        decorator = f"@{bot}.command()"
+        params = "ctx"
+
+    lines = [
+        f"{indent}{decorator}",
+        f"{indent}async def {name}({params}):",
+        f'{indent}    """Generated {kind}."""',
+    ]
+    lines.extend(_nested_body(rng, depth, indent + "    "))
+    if kind == "on_message" and not has_error:
+        lines.append(f"{indent}    await {bot}.process_commands(message)")
+
+    lines.append("")
+    return lines
+
+
+def generate_source(
+    config: ProjectConfig, *, bot: str = "bot", rng: Optional[random.Random] = None
+) -> str:
+    """Return a single bot file containing the configured handlers."""
+    rng = rng or random.Random(config.seed)
+    asyncio_run = config.entry_point == "asyncio_run"
+    indent = "    " if asyncio_run else ""
+    lines: List[str] = [
+        "import asyncio",
+        "import logging",
+        "",
+        "import nextcord",
+        "from nextcord.ext import commands",
+        "",
+        "log = logging.getLogger(__name__)",
+        f"{bot} = commands.Bot(command_prefix='!')",
+        "",
+    ]
+    if asyncio_run:
+        lines.append("async def main():")
+
+    def name_for(base: str, index: int) -> str:
+        return f"{base}_{index}"
+
+    lines.extend(
+        _handler(
+            rng,
+            kind="on_message",
+            name="on_message",
+            bot=bot,
+            depth=config.nesting_depth,
+            error_density=config.error_density,
+            indent=indent,
+        )
+    )
+    for kind, count in (
+        ("event", config.events),
+        ("listener", config.listeners),
+        ("command", config.commands),
+    ):
+        for index in range(count):
+            base = rng.choice(_EVENT_NAMES) if kind != "command" else "command"
+            lines.extend(
+                _handler(
+                    rng,
+                    kind=kind,
+                    name=name_for(base, index),
+                    bot=bot,
+                    depth=config.nesting_depth,
+                    error_density=config.error_density,
+                    indent=indent,
+                )
+            )
+
+    if asyncio_run:
+        lines.append(f"    await {bot}.start('token')")
+        lines.append("")
+        lines.append('if __name__ == "__main__":')
+        lines.append("    asyncio.run(main())")
+    else:
+        lines.append('if __name__ == "__main__":')
+        lines.append(f"    {bot}.run('token')")
+
+    lines.append("")
+    return "\n".join(lines)
+
+
+def generate_plain_source(rng: random.Random, *, functions: int = 20) -> str:
+    """Return a file with nothing to migrate, I.e. a model or util module."""
+    lines: List[str] = ["import dataclasses", "", ""]
+    for index in range(functions):
+        lines.extend(
+            [
+                "@dataclasses.dataclass",
+                f"class Model{index}:",
+                "    id: int",
+                "    name: str",
+                "",
+                f"    def describe_{index}(self, value: int) -> str:",
+                f"        return f'{{self.name}}: {{value * {index}}}'",
+                "",
+                "",
+            ]
+        )
+
+    return "\n".join(lines)
+
+
+def generate_project(root: Path, config: ProjectConfig) -> Path:
+    """Write a synthetic project under root, returning the main file's path."""
+    rng = random.Random(config.seed)
+    root.mkdir(parents=True, exist_ok=True)
+    main_file = root / "main.py"
+    main_file.write_text(generate_source(config, rng=rng))
+
+    cog_directory = root / "cogs"
+    cog_directory.mkdir(exist_ok=True)
+    cog_config = config._replace(
+        events=config.cog_handlers,
+        listeners=config.cog_handlers,
+        commands=config.cog_handlers,
+        entry_point="bot_run",
+    )
+    for index in range(config.cogs):
+        (cog_directory / f"cog_{index}.py").write_text(
+            generate_source(cog_config, rng=rng)
+        )
+
+    util_directory = root / "utils"
+    util_directory.mkdir(exist_ok=True)
+    for index in range(config.plain_files):
+        (util_directory / f"util_{index}.py").write_text(generate_plain_source(rng))
+
+    return main_file
@@ -0,0 +1,242 @@
+"""Benchmark Aegir against synthetic bot projects.
+
+Usage::
+
+    python -m benchmarks.run --output bench.json
+    python -m benchmarks.run --output new.json --compare bench.json
+"""
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import libcst
+
+from aegir import Aegir, SourceFile
+from aegir.analyzer import Analyzer
+from aegir.bot_items import MainFile
+from benchmarks.generator import ProjectConfig, generate_project, generate_source
+
+SCENARIOS: Dict[str, ProjectConfig] = {
+    "small": ProjectConfig(events=5, listeners=5, commands=5, cogs=5, plain_files=5),
+    "medium": ProjectConfig(
+        events=25, listeners=25, commands=25, cogs=25, plain_files=25
+    ),
+    "large": ProjectConfig(
+        events=100,
+        listeners=100,
+        commands=100,
+        cogs=100,
+        plain_files=100,
+        nesting_depth=4,
+    ),
+    "asyncio_run": ProjectConfig(
+        events=25, listeners=25, commands=25, cogs=10, entry_point="asyncio_run"
+    ),
+    "clean": ProjectConfig(
+        events=25, listeners=25, commands=25, cogs=25, plain_files=25, error_density=0
+    ),
+    "dense_errors": ProjectConfig(
+        events=25, listeners=25, commands=25, cogs=25, error_density=1
+    ),
+}
+
+
+def _time(func: Callable[[], object], repeat: int) -> Dict[str, float]:
+    wall: List[float] = []
+    cpu: List[float] = []
+    for _ in range(repeat):
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        func()
+        wall.append(time.perf_counter() - wall_start)
+        cpu.append(time.process_time() - cpu_start)
+
+    return {
+        "wall_min": min(wall),
+        "wall_median": statistics.median(wall),
+        "cpu_median": statistics.median(cpu),
+    }
+
+
+def _peak_memory(func: Callable[[], object]) -> int:
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def _phases(source: str, repeat: int) -> Dict[str, Dict[str, float]]:
+    module = Aegir.as_cst(source)
+
+    def analyse() -> Analyzer:
+        analyzer = Analyzer(backref=Aegir, bot_variable="bot")
+        module.visit(analyzer)
+        return analyzer
+
+    analyzer = analyse()
+
+    def build_errors() -> None:
+        for event in analyzer.events:
+            # Bypass memoization to measure construction itself
+            event._errors = None
+            event.errors  # noqa
+
+    return {
+        "parse": _time(lambda: Aegir.as_cst(source), repeat),
+        "analysis": _time(analyse, repeat),
+        "errors": _time(build_errors, repeat),
+    }
+
+
+def bench_scenario(
+    name: str, config: ProjectConfig, *, repeat: int, workers: int
+) -> dict:
+    source = generate_source(config)
+    with tempfile.TemporaryDirectory() as directory:
+        main_file = generate_project(Path(directory), config)
+
+        def source_file():
+            return SourceFile(source, backref=Aegir, bot_variable="bot").convert()
+
+        def main():
+            MainFile(main_file, backref=Aegir, bot_variable="bot").convert()
+
+        def project(
+            worker_count: int, fast_tier: bool = True, qualified_names: bool = False
+        ):
+            aegir = Aegir(
+                main_file,
+                Path(directory) / "cogs",
+                bot_variable="bot",
+                fast_tier=fast_tier,
+                qualified_names=qualified_names,
+            )
+            aegir.convert(whole_project=True, workers=worker_count)
+            return aegir
+
+        errors = len(project(1).errors)
+        result = {
+            "config": config._asdict(),
+            "source_lines": source.count("\n"),
+            "errors_found": errors,
+            "source_file": {
+                "phases": _phases(source, repeat),
+                "total": _time(source_file, repeat),
+                "peak_memory": _peak_memory(source_file),
+            },
+            "main_file": {
+                "total": _time(main, repeat),
+                "peak_memory": _peak_memory(main),
+            },
+            "project": {
+                "serial": _time(lambda: project(1), repeat),
+                "serial_without_fast_tier": _time(
+                    lambda: project(1, fast_tier=False), repeat
+                ),
+                "serial_qualified_names": _time(
+                    lambda: project(1, qualified_names=True), repeat
+                ),
+                # Only accounts for this process, not pool workers
+                "peak_memory": _peak_memory(lambda: project(1)),
+            },
+        }
+        if workers > 1:
+            result["project"][f"workers_{workers}"] = _time(
+                lambda: project(workers), repeat
+            )
+
+    print(
+        f"{name}: source_file={result['source_file']['total']['wall_median']:.4f}s "
+        f"project={result['project']['serial']['wall_median']:.4f}s "
+        f"errors={errors}",
+        file=sys.stderr,
+    )
+    return result
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _walk_medians(data: dict, prefix: str = ""):
+    for key, value in data.items():
+        if not isinstance(value, dict):
+            continue
+
+        if "wall_median" in value:
+            yield f"{prefix}{key}", value["wall_median"]
+        else:
+            yield from _walk_medians(value, f"{prefix}{key}.")
+
+
+def compare(old: dict, new: dict) -> None:
+    """Print the ratio of new to old median timings."""
+    old_medians = dict(_walk_medians(old["scenarios"]))
+    for key, value in _walk_medians(new["scenarios"]):
+        if key not in old_medians or not old_medians[key]:
+            continue
+
+        ratio = value / old_medians[key]
+        marker = " <-- regression" if ratio > 1.1 else ""
+        print(f"{key}: {old_medians[key]:.4f}s -> {value:.4f}s ({ratio:.2f}x){marker}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--scenario",
+        action="append",
+        choices=sorted(SCENARIOS),
+        help="Which scenarios to run, defaults to all of them.",
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--output", type=Path, default=None)
+    parser.add_argument(
+        "--compare", type=Path, default=None, help="A previous output to compare to."
+    )
+    args = parser.parse_args(argv)
+
+    results = {
+        "revision": _git_revision(),
+        "python": platform.python_version(),
+        "libcst": getattr(libcst, "__version__", None),
+        "repeat": args.repeat,
+        "scenarios": {
+            name: bench_scenario(
+                name, SCENARIOS[name], repeat=args.repeat, workers=args.workers
+            )
+            for name in args.scenario or SCENARIOS
+        },
+    }
+    output = json.dumps(results, indent=2)
+    if args.output is not None:
+        args.output.write_text(output)
+    else:
+        print(output)
+
+    if args.compare is not None:
+        compare(json.loads(args.compare.read_text()), results)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -39,6 +39,7 @@ setup(
     packages=find_packages(include=("aegir", "aegir.*")),
     install_requires=parse_requirements_file("requirements.txt"),
     extras_requires={},
+    entry_points={"console_scripts": ["aegir = aegir.cli:main"]},
     classifiers=[
         "Programming Language :: Python :: 3",
         "License :: OSI Approved :: MIT License",
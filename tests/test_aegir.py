@@ -0,0 +1,60 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from aegir import Aegir, AnalysisCache
+from benchmarks.generator import ProjectConfig, generate_project
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_convert_and_iter_errors_report_same_paths(tmp_path, workers):
+    main_file = generate_project(
+        tmp_path / "project", ProjectConfig(cogs=3, error_density=0.5)
+    )
+    cache = AnalysisCache(tmp_path / "cache")
+
+    streamed = list(Aegir(main_file, bot_variable="bot").iter_errors(workers=workers))
+    assert streamed
+    assert all(not record.file_path.startswith("/") for record in streamed)
+
+    # The second conversion is served from the cache
+    for _ in range(2):
+        aegir = Aegir(main_file, bot_variable="bot", compact=True, cache=cache)
+        aegir.convert(whole_project=True, workers=workers)
+
+        assert sorted(aegir.errors) == sorted(streamed)
+
+
+UTF8_SCRIPT = """
+import sys
+from pathlib import Path
+
+from aegir import Aegir
+
+main_file = Path(sys.argv[1])
+aegir = Aegir(main_file, bot_variable="bot", follow_imports=True)
+print([file.name for file in aegir.discover_files()])
+print(Aegir.as_cst(main_file).code == main_file.read_bytes().decode("utf-8"))
+"""
+
+
+def test_files_are_read_as_utf8(tmp_path):
+    (tmp_path / "main.py").write_bytes('import greet\n\nprint("Café ☕")\n'.encode())
+    (tmp_path / "greet.py").write_bytes('print("Grüß dich")\n'.encode())
+    (tmp_path / "unused.py").write_bytes(b"print()\n")
+    # Without forcing UTF-8 files would be decoded as ASCII
+    env = {**os.environ, "LC_ALL": "C", "PYTHONCOERCECLOCALE": "0", "PYTHONUTF8": "0"}
+
+    result = subprocess.run(
+        [sys.executable, "-c", UTF8_SCRIPT, str(tmp_path / "main.py")],
+        capture_output=True,
+        check=True,
+        cwd=Path(__file__).parent.parent,
+        env=env,
+        text=True,
+    )
+
+    assert result.stdout.splitlines() == ["['greet.py']", "True"]
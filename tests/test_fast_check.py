@@ -0,0 +1,129 @@
+from pathlib import Path
+
+import pytest
+
+from aegir import Aegir, SourceFile
+from aegir.fast_check import fast_check
+from benchmarks.generator import ProjectConfig, generate_project
+from benchmarks.run import SCENARIOS
+
+
+def _summary(parsed_data):
+    compact = parsed_data.compact()
+    return compact.events, compact.commands, compact.errors
+
+
+def _convert(main_file: Path, *, bot_variable: str, fast_tier: bool):
+    aegir = Aegir(
+        main_file, bot_variable=bot_variable, compact=True, fast_tier=fast_tier
+    )
+    aegir.convert(whole_project=True)
+    return aegir.errors, {
+        file: _summary(parsed_data) for file, parsed_data in aegir.project_files.items()
+    }
+
+
+@pytest.mark.parametrize(
+    "config",
+    [
+        SCENARIOS["small"],
+        SCENARIOS["clean"],
+        SCENARIOS["dense_errors"]._replace(cogs=5),
+        SCENARIOS["asyncio_run"],
+        ProjectConfig(cogs=5, error_density=0.5, seed=1),
+        ProjectConfig(cogs=5, entry_point="asyncio_run", error_density=0, seed=2),
+    ],
+)
+@pytest.mark.parametrize("bot_variable", ["bot", ""])
+def test_fast_tier_matches_full_analysis(tmp_path, config, bot_variable):
+    main_file = generate_project(tmp_path, config)
+
+    assert _convert(main_file, bot_variable=bot_variable, fast_tier=True) == _convert(
+        main_file, bot_variable=bot_variable, fast_tier=False
+    )
+
+
+SEMICOLONS = """
+async def main():
+    @bot.event
+    async def on_ready(): pass
+
+x = 1; asyncio.run(main())
+"""
+
+CONTINUATION = """
+async def main():
+    @bot.event
+    async def on_ready(): pass
+
+x = 1; \\
+asyncio.run(main())
+"""
+
+ASYNCIO_RUN = """
+import asyncio
+
+async def main():
+    async with bot:
+        @bot.event
+        async def on_ready(): pass
+
+        @bot.listen("on_message")
+        async def log_messages(message): pass
+
+        await bot.start(TOKEN)
+
+if __name__ == "__main__":
+    asyncio.run(main())
+"""
+
+ASYNCIO_RUN_KEYWORD = """
+async def main():
+    @bot.event
+    async def on_ready(): pass
+
+asyncio.run(main=main())
+"""
+
+RUN_WITH_OPTIONS = """
+@bot.event
+async def on_message(message):
+    await bot.process_commands(message)
+
+bot.run(token, reconnect=True)
+"""
+
+
+@pytest.mark.parametrize(
+    "source",
+    [SEMICOLONS, CONTINUATION, ASYNCIO_RUN, ASYNCIO_RUN_KEYWORD, RUN_WITH_OPTIONS],
+)
+@pytest.mark.parametrize("bot_variable", ["bot", ""])
+def test_fast_check_matches_full_analysis(source, bot_variable):
+    fast = fast_check(source, bot_variable)
+    full = SourceFile(source, backref=Aegir, bot_variable=bot_variable).convert()
+
+    if fast is not None:
+        assert _summary(fast) == _summary(full)
+
+
+def test_fast_check_finds_handlers_within_asyncio_run():
+    parsed_data = fast_check(ASYNCIO_RUN, "bot")
+
+    assert parsed_data is not None
+    assert [event.name for event in parsed_data.events] == [
+        "on_ready",
+        "log_messages",
+    ]
+
+
+def test_fast_check_leaves_line_continuations_to_full_analysis():
+    assert fast_check(CONTINUATION, "bot") is None
+
+
+def test_fast_check_only_checks_first_statement_of_line():
+    # The same as libcst, so asyncio.run after a semicolon is never seen
+    parsed_data = fast_check(SEMICOLONS, "bot")
+
+    assert parsed_data is not None
+    assert parsed_data.events == []
@@ -0,0 +1,76 @@
+from aegir import Aegir, SourceFile
+from aegir.fixer import apply_fixes, write_atomically
+
+SOURCE = """from nextcord.ext import commands
+
+bot = commands.Bot()
+
+
+@bot.event()
+async def on_message(message):
+    print("Café ☕")
+
+
+bot.run("token")
+"""
+
+FIXED = """from nextcord.ext import commands
+
+bot = commands.Bot()
+
+
+@bot.event
+async def on_message(message):
+    print("Café ☕")
+    await bot.process_commands(message)
+
+
+bot.run("token")
+"""
+
+
+def test_apply_fixes_to_same_function():
+    source_file = SourceFile(SOURCE, backref=Aegir, bot_variable="bot")
+    errors = source_file.convert().errors
+
+    assert sorted(error.rule_id for error in errors) == [
+        "event-called",
+        "on-message-without-process-commands",
+    ]
+    assert apply_fixes(source_file.file_cst, errors).code == FIXED
+
+
+def test_fix_rewrites_file(tmp_path):
+    main_file = tmp_path / "main.py"
+    main_file.write_bytes(SOURCE.encode("utf-8"))
+
+    diffs = Aegir(main_file, bot_variable="bot").fix()
+
+    assert list(diffs) == [main_file]
+    assert diffs[main_file].startswith("--- a/main.py\n+++ b/main.py\n")
+    assert main_file.read_bytes().decode("utf-8") == FIXED
+    # Nothing is left to fix
+    assert Aegir(main_file, bot_variable="bot").fix() == {}
+
+
+def test_fix_dry_run_leaves_file_untouched(tmp_path):
+    main_file = tmp_path / "main.py"
+    main_file.write_bytes(SOURCE.encode("utf-8"))
+
+    diffs = Aegir(main_file, bot_variable="bot").fix(dry_run=True)
+
+    assert list(diffs) == [main_file]
+    assert main_file.read_bytes() == SOURCE.encode("utf-8")
+    assert [path.name for path in tmp_path.iterdir()] == ["main.py"]
+
+
+def test_write_atomically_keeps_mode(tmp_path):
+    file = tmp_path / "main.py"
+    file.write_text("old")
+    file.chmod(0o755)
+
+    write_atomically(file, "new")
+
+    assert file.read_text() == "new"
+    assert file.stat().st_mode & 0o777 == 0o755
+    assert [path.name for path in tmp_path.iterdir()] == ["main.py"]
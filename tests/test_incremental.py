@@ -0,0 +1,60 @@
+import subprocess
+
+import pytest
+
+from aegir import Aegir, AnalysisCache
+from aegir.cli import main
+from benchmarks.generator import ProjectConfig, generate_project
+
+
+def _git(root, *args):
+    subprocess.run(["git", *args], cwd=root, check=True, capture_output=True, text=True)
+
+
+@pytest.fixture
+def project(tmp_path):
+    main_file = generate_project(
+        tmp_path / "project", ProjectConfig(cogs=3, error_density=0.5)
+    )
+    root = main_file.parent
+    _git(root, "init", "-q")
+    _git(root, "add", ".")
+    _git(
+        root,
+        "-c",
+        "user.name=aegir",
+        "-c",
+        "user.email=aegir@example.com",
+        "commit",
+        "-qm",
+        "Initial",
+    )
+    return main_file
+
+
+def test_since_uses_cache(tmp_path, project, monkeypatch):
+    cache = AnalysisCache(tmp_path / "cache")
+    expected = sorted(Aegir(project, bot_variable="bot").iter_errors())
+
+    first = Aegir(project, bot_variable="bot", cache=cache)
+    assert (
+        sorted(first.convert_incremental("HEAD", tmp_path / "first.json")) == expected
+    )
+    assert any(cache.directory.glob("*/*.json"))
+
+    # Without a report every file is analysed again, unless it is cached
+    stored = []
+    monkeypatch.setattr(cache, "set", lambda *args: stored.append(args))
+    second = Aegir(project, bot_variable="bot", cache=cache)
+    assert sorted(second.convert_incremental("HEAD", tmp_path / "second.json")) == (
+        expected
+    )
+    assert stored == []
+
+
+def test_since_unknown_revision_is_an_error(tmp_path, project, capsys):
+    with pytest.raises(SystemExit) as exc_info:
+        main([str(project), "--since", "nonexistent", "--report", str(tmp_path / "r")])
+
+    assert exc_info.value.code == 2
+    assert "nonexistent" in capsys.readouterr().err
@@ -0,0 +1,32 @@
+from aegir.lsp import Document
+
+SOURCE = """@bot.event()
+async def on_ready():
+    print("😀")"""
+
+
+def _range(start_line, start_character, end_line, end_character):
+    return {
+        "start": {"line": start_line, "character": start_character},
+        "end": {"line": end_line, "character": end_character},
+    }
+
+
+def test_change_after_emoji_uses_utf16_columns():
+    document = Document('x = "😀"; y = 1\n', bot_variable="bot")
+
+    # The emoji is two UTF-16 code units, so 1 is at character 14
+    document.apply_change({"range": _range(0, 14, 0, 15), "text": "2"})
+
+    assert document.text == 'x = "😀"; y = 2\n'
+
+
+def test_code_action_range_uses_utf16_columns():
+    document = Document(SOURCE, bot_variable="bot")
+
+    actions = document.code_actions("file:///main.py", _range(0, 0, 0, 0))
+
+    assert len(actions) == 1
+    (edit,) = actions[0]["edit"]["changes"]["file:///main.py"]
+    assert edit["range"] == _range(0, 0, 2, 15)
+    assert edit["newText"] == SOURCE.replace("@bot.event()", "@bot.event")
@@ -0,0 +1,78 @@
+import json
+import pickle
+
+import pytest
+
+from aegir import Aegir, SourceFile
+from aegir.memo import FunctionMemo
+
+GLOBAL_BOT = """import nextcord
+
+
+async def setup():
+    global mybot
+    mybot = nextcord.Client()
+
+
+@mybot.event()
+async def on_ready():
+    pass
+"""
+
+NESTED_CLASS = """from nextcord.ext import commands
+
+
+async def setup():
+    class MyBot(commands.Bot):
+        pass
+
+    global mybot
+    mybot = MyBot()
+
+
+@mybot.event()
+async def on_ready():
+    pass
+"""
+
+
+def _convert(source, memo):
+    compact = (
+        SourceFile(source, backref=Aegir, bot_variable="bot", memo=memo)
+        .convert()
+        .compact()
+    )
+    return compact.events, compact.commands, compact.errors
+
+
+@pytest.mark.parametrize("source", [GLOBAL_BOT, NESTED_CLASS])
+def test_warm_memo_matches_cold(source):
+    memo = FunctionMemo()
+
+    cold = _convert(source, memo)
+    warm = _convert(source, memo)
+
+    assert [error.rule_id for error in cold[2]] == ["event-called"]
+    assert warm == cold
+    assert warm == _convert(source, None)
+
+
+def test_memo_round_trips_through_json(tmp_path):
+    path = tmp_path / "memo.json"
+    memo = FunctionMemo(path=path)
+    cold = _convert(GLOBAL_BOT, memo)
+    memo.save()
+
+    loaded = FunctionMemo(path=path)
+    assert _convert(GLOBAL_BOT, loaded) == cold
+    assert loaded.hits == memo.misses
+    assert json.loads(path.read_text())["entries"]
+
+
+def test_unreadable_memo_is_ignored(tmp_path):
+    path = tmp_path / "memo.json"
+    path.write_bytes(pickle.dumps({"entries": {}}))
+
+    memo = FunctionMemo(path=path)
+    assert _convert(GLOBAL_BOT, memo) == _convert(GLOBAL_BOT, None)
+    assert memo.hits == 0
@@ -0,0 +1,87 @@
+from typing import List
+
+import libcst
+import pytest
+from libcst.metadata import MetadataWrapper, PositionProvider
+
+from aegir import Aegir, FormatError, SourceFile
+from aegir.positions import compute_positions
+from aegir.rules import Rule, RuleContext, default_registry
+
+SOURCE = """from nextcord.ext.commands import (
+    Bot,
+    Cog,
+)
+
+bot = Bot()
+
+
+@bot.event()
+async def on_ready(*args, key: int = 1):
+    values = {"a": [1, 2][0]}
+    return (values)
+"""
+
+
+class _AllNodes(libcst.CSTVisitor):
+    def __init__(self):
+        self.nodes: List[libcst.CSTNode] = []
+
+    def on_visit(self, node: libcst.CSTNode) -> bool:
+        self.nodes.append(node)
+        return True
+
+
+class ImportFromRule(Rule):
+    rule_id = "test-import-from"
+    node_types = (libcst.ImportFrom,)
+
+    def check(self, node: libcst.ImportFrom, context: RuleContext) -> List[FormatError]:
+        return [
+            FormatError(
+                rule_id=self.rule_id,
+                title="Import from.",
+                description="",
+                old_cst=node,
+                fixed_cst=node,
+            )
+        ]
+
+
+@pytest.fixture
+def import_from_rule():
+    rule = default_registry.register(ImportFromRule())
+    yield rule
+    default_registry.unregister(rule.rule_id)
+
+
+def test_compute_positions_matches_position_provider():
+    wrapper = MetadataWrapper(libcst.parse_module(SOURCE))
+    expected = wrapper.resolve(PositionProvider)
+    visitor = _AllNodes()
+    wrapper.module.visit(visitor)
+
+    positions = compute_positions(wrapper.module, visitor.nodes)
+
+    assert len(positions) == len(visitor.nodes)
+    for node in visitor.nodes:
+        assert positions[node] == expected[node], type(node).__name__
+
+
+@pytest.mark.parametrize("node_type", [libcst.Parameters, libcst.Index])
+def test_compute_positions_for_single_node(node_type):
+    wrapper = MetadataWrapper(libcst.parse_module(SOURCE))
+    expected = wrapper.resolve(PositionProvider)
+    node = next(node for node in expected if isinstance(node, node_type))
+
+    assert compute_positions(wrapper.module, [node]) == {node: expected[node]}
+
+
+def test_position_of_non_decorator_rule(import_from_rule):
+    parsed_data = SourceFile(SOURCE, backref=Aegir, bot_variable="bot").convert()
+    error = next(
+        error for error in parsed_data.errors if error.rule_id == "test-import-from"
+    )
+
+    assert (error.position.start.line, error.position.start.column) == (1, 0)
+    assert (error.position.end.line, error.position.end.column) == (4, 1)
@@ -0,0 +1,119 @@
+import ast
+from typing import List
+
+import libcst
+import pytest
+
+from aegir import (
+    Aegir,
+    AnalysisCache,
+    FormatError,
+    Rule,
+    RuleContext,
+    SourceCache,
+    default_registry,
+)
+from aegir.fast_check import fast_check
+from aegir.prefilter import might_need_migration
+from benchmarks.generator import ProjectConfig, generate_project
+
+PLAIN = """import dataclasses
+
+
+@dataclasses.dataclass
+class Model:
+    id: int
+"""
+
+
+class ImportRule(Rule):
+    rule_id = "test-import"
+    node_types = (libcst.Import,)
+
+    def check(self, node: libcst.Import, context: RuleContext) -> List[FormatError]:
+        return [
+            FormatError(
+                rule_id=self.rule_id,
+                title="Import.",
+                description="",
+                old_cst=node,
+                fixed_cst=node,
+            )
+        ]
+
+
+@pytest.fixture
+def import_rule():
+    rule = default_registry.register(ImportRule())
+    yield rule
+    default_registry.unregister(rule.rule_id)
+
+
+def _expected_imports(main_file) -> List[tuple]:
+    expected = []
+    for file in main_file.parent.rglob("*.py"):
+        for node in ast.walk(ast.parse(file.read_text())):
+            if isinstance(node, ast.Import):
+                expected.append((str(file.relative_to(main_file.parent)), node.lineno))
+
+    return sorted(expected)
+
+
+def test_rule_without_check_cannot_be_registered():
+    class HalfWrittenRule(Rule):
+        rule_id = "half-written"
+        node_types = (libcst.Call,)
+
+    with pytest.raises(TypeError):
+        default_registry.register(HalfWrittenRule())
+
+    assert "half-written" not in default_registry.rule_ids
+
+
+def test_registered_rule_is_dispatched(import_rule, monkeypatch):
+    monkeypatch.setattr(Aegir, "source_cache", SourceCache())
+    # Cached before the rule was registered
+    default_registry.unregister(import_rule.rule_id)
+    assert Aegir.convert_source(PLAIN).errors == []
+    default_registry.register(import_rule)
+
+    errors = Aegir.convert_source(PLAIN).errors
+
+    assert [error.rule_id for error in errors] == ["test-import"]
+    assert errors[0].position.start.line == 1
+
+
+def test_builtin_shortcuts_step_aside(import_rule):
+    assert might_need_migration(PLAIN, "bot")
+    assert fast_check(PLAIN, "bot") is None
+
+
+def test_cache_keys_depend_on_rules(import_rule):
+    cache = AnalysisCache("unused")
+    key = cache.key_for(PLAIN)
+    default_registry.unregister(import_rule.rule_id)
+
+    assert cache.key_for(PLAIN) != key
+    default_registry.register(import_rule)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_registered_rule_within_project(tmp_path, import_rule, workers):
+    main_file = generate_project(
+        tmp_path / "project", ProjectConfig(cogs=2, plain_files=2)
+    )
+    cache = AnalysisCache(tmp_path / "cache")
+    default_registry.unregister(import_rule.rule_id)
+    # Cached before the rule was registered
+    list(Aegir(main_file, bot_variable="bot", cache=cache).iter_errors())
+    default_registry.register(import_rule)
+
+    records = Aegir(main_file, bot_variable="bot", cache=cache).iter_errors(
+        workers=workers
+    )
+
+    assert sorted(
+        (record.file_path, record.line)
+        for record in records
+        if record.rule_id == "test-import"
+    ) == _expected_imports(main_file)